@@ -1,87 +1,31 @@
+import time
+_script_start = time.perf_counter()
 
-import pandas as pd
-import numpy as np
 import streamlit as st
-from mistralai import Mistral, UserMessage, SystemMessage, AssistantMessage
-import json
 import pandas as pd
-import matplotlib.pyplot as plt
-import plotly.express as px
-import re
-import time
 import os
 from streamlit_lottie import st_lottie
-import requests
-import io
-from sentence_transformers import SentenceTransformer
-import pickle
-import copy
-
-# --- Load Models ---
-MODEL_DIR = "models"
-try:
-    with open(os.path.join(MODEL_DIR, "low_custom.pkl"), "rb") as f:
-        model_low = pickle.load(f)
-    with open(os.path.join(MODEL_DIR, "mid_custom.pkl"), "rb") as f:
-        model_mid = pickle.load(f)
-    with open(os.path.join(MODEL_DIR, "high_custom.pkl"), "rb") as f:
-        model_high = pickle.load(f)
-    with open(os.path.join(MODEL_DIR, "duration_model.pkl"), "rb") as f:
-        duration_model = pickle.load(f)
-    with open(os.path.join(MODEL_DIR, "ohe.pkl"), "rb") as f:
-        ohe = pickle.load(f)
-    with open(os.path.join(MODEL_DIR, "scaler.pkl"), "rb") as f:
-        scaler = pickle.load(f)
-    with open(os.path.join(MODEL_DIR, "ohe_duration.pkl"), "rb") as f:
-        ohe_duration = pickle.load(f)
-except Exception as e:
-    st.error(f"🔴 Error loading models: {e}")
-    st.stop()
-
-bert_model = SentenceTransformer('all-MiniLM-L6-v2')
-model_dict = {'low': model_low, 'mid': model_mid, 'high': model_high}
-
-# === Phase Mapping ===
-phase_mapping = {
-    "I. Scope": "I. Site Preperation",
-    "II. Design": "II. Foundation",
-    "III. Commissioning": "III. Commissioning",
-    "IV. Purch & Install": "IV. Purch & Install",
-    "V. Construction": "V. Construction"
-}
+
+import startup_profiler
+from estimation import PHASE_MAPPING as phase_mapping, LLM_DURATION_WEIGHT, get_engine
+
+# Heavy dependencies (sentence_transformers/torch, sklearn pickles, mistralai,
+# plotly, requests) are imported on the code paths that need them so the
+# landing page renders without waiting on them. The estimation engine only
+# touches the models once a prediction is requested.
+engine = get_engine()
 
 if "project_type" not in st.session_state:
     st.session_state.project_type = None
 if "cost_bucket" not in st.session_state:
     st.session_state.cost_bucket = None
-def prepare_single_row(description, phase, duration_weeks):
-    df = pd.DataFrame([{
-        "Project Phase Name": phase,
-        "project_status": "Complete",
-        "timeline_status": "Complete",
-        "end_date_missing": True,
-        "duration_days": duration_weeks * 7
-    }])
-    embedding = bert_model.encode([description])
-    cat_feats = ohe.transform(df[["Project Phase Name", "project_status", "timeline_status", "end_date_missing"]])
-    num_feats = scaler.transform(df[["duration_days"]])
-    return np.hstack([embedding, cat_feats, num_feats])
-
-def prepare_features_for_duration(description, phase_name):
-    df = pd.DataFrame([{
-        "description_no_stopwords": description,
-        "Project Phase Name": phase_name,
-        "project_status": "Complete",
-        "timeline_status": "Complete"
-    }])
-    embedding = bert_model.encode(df["description_no_stopwords"].tolist())
-    cat_feats = ohe_duration.transform(df[["Project Phase Name", "project_status", "timeline_status"]])
-    return np.hstack([embedding, cat_feats])
 
 ASSETS_DIR = "assets/"
 LOGO_PATH = os.path.join(ASSETS_DIR, "Solace_logo.png")
 # === Helper function to load Lottie animation ===
+@st.cache_data(show_spinner=False)
 def load_lottie_url(url: str):
+    import requests
     r = requests.get(url)
     if r.status_code != 200:
         return None
@@ -103,12 +47,6 @@ with st.sidebar:
     st.markdown("🔗 [GitHub Repo](https://github.com/AnushkaKatiyar)")
     st.markdown("💬 Powered by Mistral + ML Models")
 
-# === Model Setup ===
-model = SentenceTransformer("all-MiniLM-L6-v2")
-
-# Load API key from Streamlit secrets
-mistral_api_key = st.secrets["mistral_api_key"]
-client = Mistral(api_key=mistral_api_key)
 st.set_page_config(page_title="AI Chatbot Assistant", layout="wide")
 
 st.markdown("""
@@ -132,6 +70,15 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+if startup_profiler.enabled():
+    with st.sidebar.expander("⏱ Startup profile", expanded=True):
+        st.metric("First paint", f"{time.perf_counter() - _script_start:.2f}s")
+        report = st.cache_resource(startup_profiler.profile_startup, show_spinner="Profiling startup...")()
+        st.code(startup_profiler.format_report(report))
+        if st.session_state.get("prompt_tokens"):
+            st.caption("Prompt tokens sent per question turn (estimated)")
+            st.bar_chart(st.session_state.prompt_tokens)
+
 # Store selection in session state
 if "project_type" not in st.session_state:
     st.session_state.project_type = None
@@ -217,32 +164,13 @@ if st.session_state.project_type == "new":
     st.subheader("New Project Planning")
     # your existing pipeline goes here (assistant, model predictions, etc.)
 
-    def animated_typing(message, delay=0.03):
-        placeholder = st.empty()
-        full_text = ""
-        for char in message:
-            full_text += char
-            placeholder.markdown(f"**{full_text}**")
-            time.sleep(delay)
-
     if "has_seen_welcome" not in st.session_state:
         st.session_state.has_seen_welcome = True
         with st.chat_message("assistant"):
-            animated_typing("Hi, Welcome to Solace AI Project Manager Demo 👋\n\nI can generate project plan for a new school development in New York City based on your requirements. This is the scope of the demo.\n\n Can I please help make the plan for you? ")
-
-    # Define the questions to ask sequentially
-    questions = [
-        ("ProjectDescription", "Please describe the project in a few sentences."),
-        ("Location", "Which part of NYC is the school located in?"),
-        ("Grades", "How many grades will the school have?"),
-        ("StudentsPerClass", "What is the average number of students per class?"),
-        ("Timeline", "What is the expected construction timeline (in months)?"),
-        ("SquareFootage", "What is the square footage of the construction?"),
-        ("SpecialReqs", "Are there any special facilities or requirements needed?"),       
-        # ("Floors", "How many floors will the building have?"),
-        # ("DemolitionNeeded", "Is demolition needed?"),
-        # ("Basement", "Is a basement needed?"),
-    ]
+            st.markdown("**Hi, Welcome to Solace AI Project Manager Demo 👋\n\nI can generate project plan for a new school development in New York City based on your requirements. This is the scope of the demo.\n\n Can I please help make the plan for you? **")
+
+    # Define the questions to ask sequentially (shared with benchmark_conversation.py)
+    from prompts import QUESTIONS as questions
 
     # Initialize session state for collected info and chat history
     if "collected_info" not in st.session_state:
@@ -260,215 +188,164 @@ if st.session_state.project_type == "new":
         st.session_state.last_question_key = None
 
 
+    # Answers are validated and the next question rendered locally; the LLM
+    # is only called when the user asks a free-form question instead
+    from question_engine import QuestionEngine
+    question_engine = QuestionEngine(questions)
+
     # Function to find the next unanswered question
     def get_next_question():
-        for key, question in questions:
-            if st.session_state.collected_info[key] in [None, ""]:
-                return key, question
-        return None, None
+        return question_engine.next_question(st.session_state.collected_info)
+
+    from mistralai import UserMessage, AssistantMessage
+    from chat_history import compact_messages, record_usage
+    from mistral_client import get_client
+    from llm_orchestrator import submit, join, DEFAULT_TIMEOUT as LLM_TIMEOUT
+    from stream_json import parse_plan_stream
+    from plan_schema import JSON_MODE, PlanSchemaError, parse_durations, parse_plan
+    from prompts import MODEL as LLM_MODEL, clarification_system_prompt, plan_messages, duration_messages
+    # One pooled, rate-limited client per process, shared by every session and
+    # rerun. Identical prompts (e.g. the per-phase duration prompt on every
+    # rerun of the results page) are answered from the on-disk response cache.
+    # mistral_server_url / MISTRAL_SERVER_URL point the client at another
+    # endpoint, e.g. the local stand-in in mock_mistral_server.py, which needs
+    # no secrets file at all.
+    def secret(name, env_var):
+        try:
+            value = st.secrets.get(name)
+        except FileNotFoundError:
+            value = None
+        return value or os.environ.get(env_var)
 
-    client = Mistral(api_key=st.secrets["mistral_api_key"])
+    client = get_client(api_key=secret("mistral_api_key", "MISTRAL_API_KEY") or "local",
+                        server_url=secret("mistral_server_url", "MISTRAL_SERVER_URL"))
 
     # Capture user input
     user_input = st.chat_input("Type your answer here...")
 
-    if user_input:
-        # Save user input as answer to the last asked question
-        if st.session_state.last_question_key is not None:
-            st.session_state.collected_info[st.session_state.last_question_key] = user_input
+    # Display the chat history so far
+    for msg in st.session_state.chat_history:
+        role = "user" if isinstance(msg, UserMessage) else "assistant"
+        with st.chat_message(role):
+            st.markdown(msg.content)
 
+    if user_input:
         # Append user message to chat history
         st.session_state.chat_history.append(UserMessage(content=user_input))
-
-        # Find the next question to ask
-        next_key, next_question = get_next_question()
-        st.session_state.last_question_key = next_key
-
-        # Compose system prompt with current collected info and next question to ask
-        if next_question:
-            system_prompt = f"""
-    You are an expert NYC school construction planner assistant.
-
-    Current collected info:
-    {json.dumps(st.session_state.collected_info, indent=2)}
-
-    Ask only the questions defined (they have been predefined, so you will get the questions, no need to add too much) and wait for user response, do not repeat question. 
-    Do not display unnecessary information or the previous questions asked. Do provide like the average for each value, like average square foot required for a school construction and average class size etc.
-    Do not display json to the user.
-    Also tell the user that they are advised to answer the questions asked and can provide more information for context but they will be asked the guided questions.
-    Next question:
-    {next_question}
-    """
+        with st.chat_message("user"):
+            st.markdown(user_input)
+
+        key = st.session_state.last_question_key
+        result, clarification = question_engine.read(key, user_input) if key is not None else (None, False)
+        if clarification:
+            # A question rather than an answer: let the model reply, then repeat
+            # the pending guided question. collected_info lives in the system
+            # prompt, so only the last exchange and a summary of earlier turns
+            # are resent, keeping every turn's prompt under the token budget.
+            question = dict(questions)[key]
+            system_prompt = clarification_system_prompt(st.session_state.collected_info, question)
+            messages = compact_messages(system_prompt, st.session_state.chat_history)
+            st.session_state.setdefault("prompt_tokens", [])
+            record_usage(st.session_state.prompt_tokens, messages)
+
+            # Stream the Mistral reply into the chat bubble as tokens arrive
+            with st.chat_message("assistant"):
+                answer = st.write_stream(
+                    client.chat.stream_text(model=LLM_MODEL, messages=messages)
+                ).strip()
+                follow_up = question_engine.render_question(key, question, st.session_state.collected_info)
+                st.markdown(follow_up)
+            assistant_reply = f"{answer}\n\n{follow_up}"
         else:
-            system_prompt = f"""
-    You have collected all the necessary project information:
-    {json.dumps(st.session_state.collected_info, indent=2)}
-    Display in formatted way, not json
-    Inform the user that all info is collected and ask if they want to generate the construction plan.
-    Ask each question only once, do not repeat the previous question, ask only the defined 7 questions.
-    """
-
-        # Compose messages to send to the model
-        messages = [SystemMessage(content=system_prompt)] + st.session_state.chat_history
-
-        # Call the Mistral model
-        response = client.chat.complete(
-            model="mistral-medium",
-            messages=messages,
-        )
-        assistant_reply = response.choices[0].message.content.strip()
+            # Save the validated answer to the last asked question, or explain what's wrong
+            intro = ""
+            if result is not None:
+                if result.ok:
+                    st.session_state.collected_info[key] = result.value
+                else:
+                    intro = result.message
+            next_key, assistant_reply = question_engine.reply(st.session_state.collected_info, intro)
+            st.session_state.last_question_key = next_key
+            with st.chat_message("assistant"):
+                st.markdown(assistant_reply)
 
         # Append assistant reply to chat history
         st.session_state.chat_history.append(AssistantMessage(content=assistant_reply))
 
-    # Display the full chat history
-    for msg in st.session_state.chat_history:
-        role = "user" if isinstance(msg, UserMessage) else "assistant"
-        with st.chat_message(role):
-            st.markdown(msg.content)
-
     # When all questions answered, show button to generate plan
     next_key, next_question = get_next_question()
     if next_key is None:
         if st.button("🚧 Generate Project Plan"):
-            summary_prompt = f"""
-    Using the collected info, generate a detailed construction plan in JSON format with phases, subtasks, vendors, permissions, materials, and labor.
-
-    Output should be a list of 5 phases, depending on the user inputs. Each phase must include:
-    - Phase: (string) e.g. "I. Site Preperation", "II. Foundation", "III. Comissioning", "IV. Purchase & Install", "V. Construction",
-    - Description: (string),a short description,
-    - Subphases/subtaskes: 5-10 sub tasks within the phases
-    - Subphase Breakdown: (list of phases and subtasks(5-10 phases and 5-10 subtasks) from above as dicts). Each dict must have:
-    - Name: (string)
-    - Description(string)
-    - Cost (USD): (number)
-    - Labor Category
-    - Vendor: (list of strings),1–2 **only actual NYC-based vendors or well-known relevant companies, not made up names** (avoid placeholders like 'VendorX', 'VendorA'),
-    - Permission if needed: (list of strings),required NYC government permissions (e.g., SCA, DoE, FDNY),
-    - Duration (weeks): (number)- Please predict realistic numbers based on actual construction timelines and if the user has provided a timeline, try to get the values in that ballpark but if they are unrealistic, then predict normal values,
-    - Resources & Material-Raw materials used in construction
-    - Item-should have the name and describe for which phases and subtask it is needed
-    - Quantity-number followed by correct units e.g-metric tonne, feet etc
-    - Cost (USD): (number), please predict realistic numbers and should not exceed 60% of the total estimated cost(the total of all the resources should be under 12 million)
-    
-
-    Collected info:
-    {json.dumps(st.session_state.collected_info, indent=2)}
-
-    Only output JSON with this structure:
-    {{ 
-    "ConstructionPhases": [
-        {{
-        "PhaseName": "string",
-        "Description": "string",
-        "EstimatedCost": number,
-        "DurationEstimate": number,
-        "Subtasks": [
-            {{
-            "SubtaskName": "string",
-            "Description": "string",
-            "CostEstimate": number,
-            "DurationEstimate": number,
-            "LaborCategories": [],
-            "Vendors": [],
-            "Permissions": []
-            }}
-        ],
-        "LaborCategories": [],
-        "Vendors": [],
-        "Permissions": []
-        }}
-    ],
-    "Resources & Materials": {{
-        "CategoryName": [
-        {{
-            "Item": "string",
-            "QuantityEstimate": "string",
-            "EstimatedCost": number
-        }}
-        ]
-    }}
-    }}
-    No extra explanation.
-    """
-            messages = [
-                SystemMessage(content="You summarize the project info and generate the final JSON plan."),
-                UserMessage(content=summary_prompt),
-            ]
-            response = client.chat.complete(
-                model="mistral-medium",
-                messages=messages,
-            )
-            final_json = response.choices[0].message.content.strip()
-            st.session_state.final_plan = final_json
-
-        description = st.session_state.collected_info.get("ProjectDescription", "")
-        phases_json_str = json.dumps(phase_mapping, indent=2)
-        ai_input = f"""
-        Based on the following project description, estimate the expected duration in weeks for each of the following construction phases, answer in numeric, no ranges:
-
-        Phases:
-        {phases_json_str}
-
-        Project Description:
-        {description}
-
-        Reply in this format (JSON):
-        {{
-            "I. Scope": "<duration in weeks>",
-            "II. Design": "<duration in weeks>",
-            "III. Commissioning": "<duration in weeks>",
-            "IV. Purch & Install": "<duration in weeks>",
-            "V. Construction": "<duration in weeks>"
-        }}
-        """
-        messages = [
-            SystemMessage(content="You are an expert NYC school construction planner."),
-            UserMessage(content=ai_input)
-        ]
-        response = client.chat.complete(
-            model="mistral-medium",
-            messages=messages
-        )
-        response_text = response.choices[0].message.content.strip()
-        match = re.search(r"\{.*\}", response_text, re.DOTALL)
-        if match:
-            clean_json = match.group(0)
-            ai_durations = json.loads(clean_json)
-        else:
-            print("JSON not found in AI response")
+            description = st.session_state.collected_info.get("ProjectDescription", "")
+            # Phase durations come from the local duration model. The LLM
+            # estimate is only requested to blend in (SOLACE_LLM_DURATION_WEIGHT)
+            # or as the fallback when the duration model isn't installed.
+            # Messages are built here: worker threads must not touch st.session_state.
+            plan_msgs = plan_messages(st.session_state.collected_info)
+            durations_future = None
+            if LLM_DURATION_WEIGHT > 0 or not engine.registry.available("duration"):
+                duration_msgs = duration_messages(description, phase_mapping)
+                # Runs in the background while the plan streams in the foreground
+                durations_future = submit(lambda: client.chat.complete(
+                    model=LLM_MODEL, messages=duration_msgs, response_format=JSON_MODE,
+                    timeout_ms=int(LLM_TIMEOUT * 1000),
+                ))
+
+            preview_slot = st.empty()
+            preview = preview_slot.container()
+            with preview:
+                st.caption("Generating project plan...")
+
+            def show_phase(phase):
+                with preview:
+                    with st.expander(f"📌 {phase.get('PhaseName', 'Phase')}", expanded=False):
+                        st.write(phase.get("Description", ""))
+                        for sub in phase.get("Subtasks", []):
+                            if isinstance(sub, dict):
+                                st.markdown(f"- {sub.get('SubtaskName', '')}")
+
+            try:
+                plan, plan_parser = parse_plan_stream(
+                    client.chat.stream_text(model=LLM_MODEL, messages=plan_msgs, response_format=JSON_MODE,
+                                            timeout_ms=int(LLM_TIMEOUT * 1000)),
+                    on_phase=show_phase,
+                )
+                if plan_parser.truncated or not plan.get("ConstructionPhases"):
+                    # Don't let "try again" replay the same unusable reply from the cache
+                    client.chat.evict(model=LLM_MODEL, messages=plan_msgs, response_format=JSON_MODE)
+                if not plan.get("ConstructionPhases"):
+                    st.error("Plan generation returned no usable phases. Please try again.")
+                else:
+                    if plan_parser.truncated:
+                        st.warning(f"⚠️ The plan response was cut off; showing the {len(plan['ConstructionPhases'])} phase(s) that completed.")
+                    st.session_state.final_plan = plan
+            except Exception as e:
+                st.error(f"Plan generation failed: {e}")
+
+            # The full plan is rendered below; drop the streaming preview
+            preview_slot.empty()
+
             ai_durations = {}
-        def predict_cost_duration(description, bucket, ai_durations):
-            predictions = []
-
-            for phase_code, display_name in phase_mapping.items():
-                # Get AI-estimated duration (in weeks)
-                try:
-                    raw_val = ai_durations.get(phase_code, "0")
-                    # Remove any non-numeric part like " weeks"
-                    numeric_str = "".join(c for c in raw_val if c.isdigit() or c == ".")
-
-                    duration_weeks = float(numeric_str) if numeric_str else 0
-                except (ValueError, TypeError):
-                    duration_weeks = 0  # fallback if parsing fails
-
-                # Prepare cost features using AI duration
-                X_cost = prepare_single_row(description, phase_code, duration_weeks)
-                model = model_dict[bucket]
-                cost = model.predict(X_cost)[0]
-
-                predictions.append({
-                    "Phase": display_name,
-                    "Predicted Duration (weeks)": round(duration_weeks, 2),
-                    "Predicted Cost (USD)": round(max(cost, 0), 2),
-                })
+            if durations_future is not None:
+                calls = join({"durations": durations_future}, timeout=LLM_TIMEOUT)
+                if calls["durations"].ok:
+                    response_text = calls["durations"].value.choices[0].message.content
+                    try:
+                        ai_durations = parse_durations(response_text, phase_mapping)
+                    except PlanSchemaError as e:
+                        print(f"Unusable phase durations in AI response: {e}")
+                        client.chat.evict(model=LLM_MODEL, messages=duration_msgs, response_format=JSON_MODE)
+                else:
+                    st.warning(f"Phase duration estimate failed: {calls['durations'].error}")
+            st.session_state.ai_durations = ai_durations
 
-            result_df = pd.DataFrame(predictions)
+        ai_durations = st.session_state.get("ai_durations", {})
+        def predict_cost_duration(description, bucket, ai_durations):
+            result_df, used_bucket = engine.predict_cost_duration(description, bucket, ai_durations)
+            if used_bucket != bucket:
+                st.warning(f"⚠️ No {bucket} cost model available, using the {used_bucket} model instead.")
             return result_df
         
-    def clean_json_string(raw_json):
-        return raw_json.strip().removeprefix("```json").removesuffix("```").strip()
-
     def safe_format_cost(x):
         try:
             return "${:,.0f}".format(float(x))
@@ -476,18 +353,13 @@ if st.session_state.project_type == "new":
             return str(x)
 
     if st.session_state.final_plan:
-        # If it's still a string, clean and parse it
+        # If it's still a string, repair and parse it locally rather than regenerating
         if isinstance(st.session_state.final_plan, str):
-            def clean_json_string(raw_json):
-                return raw_json.strip().removeprefix("```json").removesuffix("```").strip()
-            
-            cleaned = clean_json_string(st.session_state.final_plan)
             try:
-                parsed_json = json.loads(cleaned)
-                st.session_state.final_plan = parsed_json
-            except json.JSONDecodeError as e:
-                st.error(f"JSON decode failed: {e}")
-                st.stop()
+                st.session_state.final_plan = parse_plan(st.session_state.final_plan)
+            except PlanSchemaError as e:
+                st.error(f"The saved plan could not be read ({e}). Please generate it again.")
+                st.session_state.final_plan = None
 
         # Now it's a proper dict in session state — ready for rendering
         final_plan = st.session_state.final_plan
@@ -551,6 +423,29 @@ if st.session_state.project_type == "new":
             """,
             unsafe_allow_html=True
         )
+        # Nearest past NYC projects: real phases, durations and spend to ground the estimates
+        with st.expander("🏫 Similar past NYC school projects", expanded=False):
+            from similar_projects import get_similar_projects, phase_reference
+            try:
+                with st.spinner("Searching past projects..."):
+                    similar = get_similar_projects().similar_projects(description, k=5)
+            except Exception as e:
+                similar = None
+                st.caption(f"Similar projects unavailable: {e}")
+            if similar is not None and not similar.empty:
+                projects = similar.groupby(["similarity", "description", "school"], sort=False).agg(
+                    borough=("borough", "first"),
+                    phases=("phase", lambda p: ", ".join(dict.fromkeys(p))),
+                    weeks=("weeks", "sum"),
+                    spend=("spend", "sum"),
+                ).reset_index().sort_values("similarity", ascending=False).head(10)
+                projects["spend"] = projects["spend"].apply(safe_format_cost)
+                st.dataframe(projects, use_container_width=True, hide_index=True)
+                reference = phase_reference(similar)
+                if not reference.empty:
+                    st.caption("Similarity-weighted average per phase across these projects")
+                    reference["spend"] = reference["spend"].apply(safe_format_cost)
+                    st.dataframe(reference, use_container_width=True, hide_index=True)
 #########################################################################   
         st.markdown(
             """
@@ -774,7 +669,6 @@ if st.session_state.project_type == "new":
         
     ##################################################
         import plotly.express as px
-        import pandas as pd
 
         # Make sure you have your phases data
         if "final_plan" in st.session_state and st.session_state.final_plan:
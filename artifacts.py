@@ -0,0 +1,335 @@
+"""Versioned, integrity-checked model artifact package.
+
+Layout of ``models/package/``::
+
+    manifest.json          format version, encoder name, feature layouts, file hashes
+    low.ubj, ...           XGBoost boosters in native UBJSON
+    ohe/categories_0.npy   OneHotEncoder categories, one array per column
+    scaler/mean.npy        StandardScaler statistics
+
+Arrays are stored as individual .npy files (rather than one .npz archive) so
+they can be opened with ``np.load(mmap_mode="r")``. Every file's SHA-256 is
+recorded in the manifest and checked on load, and each booster records the
+hashes of the encoders it was trained with, so a booster can't silently be
+paired with a re-fitted encoder.
+"""
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+FORMAT_VERSION = 1
+PACKAGE_DIR = os.path.join("models", "package")
+MANIFEST = "manifest.json"
+
+_write_lock = threading.Lock()
+
+
+class ArtifactIntegrityError(ValueError):
+    """Raised when a packaged artifact fails its hash or layout checks."""
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _current_umask():
+    """The process umask, read without changing it where the OS allows."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+    # Elsewhere os.umask can only be read by setting it. A restrictive stand-in
+    # means a file another thread creates meanwhile is private, not world-writable.
+    mask = os.umask(0o077)
+    os.umask(mask)
+    return mask
+
+
+def publish_file(tmp, path):
+    """Rename a finished temp file onto ``path`` with normal file permissions.
+
+    mkstemp creates files as 0600, which os.replace would keep, leaving the
+    artifact unreadable to a serving user other than the one who trained it.
+    """
+    os.chmod(tmp, 0o666 & ~_current_umask())
+    os.replace(tmp, path)
+
+
+def atomic_write(path, write, suffix=".tmp"):
+    """Call ``write(tmp)`` on a temp file next to ``path``, then publish it as ``path``.
+
+    Readers see the old file or the complete new one, never a partial write.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=suffix)
+    os.close(fd)
+    write(tmp)
+    publish_file(tmp, path)
+
+
+def write_text(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _write_bytes(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _atomic_write_bytes(path, data):
+    atomic_write(path, lambda tmp: _write_bytes(tmp, data))
+
+
+def _atomic_save_npy(path, array):
+    atomic_write(path, lambda tmp: np.save(tmp, array, allow_pickle=False), suffix=".tmp.npy")
+
+
+def _category_array(categories):
+    values = list(categories)
+    if all(isinstance(v, (bool, np.bool_)) for v in values):
+        return np.asarray(values, dtype=bool)
+    return np.asarray([str(v) for v in values], dtype=str)
+
+
+class PackedOneHotEncoder:
+    """Minimal OneHotEncoder(handle_unknown='ignore') rebuilt from stored categories."""
+
+    def __init__(self, columns, categories):
+        self.columns = list(columns)
+        self.categories_ = categories
+
+    @property
+    def n_features(self):
+        return sum(len(c) for c in self.categories_)
+
+    def transform(self, df):
+        blocks = []
+        for col, cats in zip(self.columns, self.categories_):
+            values = df[col].to_numpy()
+            values = values.astype(bool) if cats.dtype == bool else values.astype(str)
+            blocks.append((values[:, None] == cats[None, :]).astype(np.float64))
+        return np.hstack(blocks)
+
+
+class PackedScaler:
+    """StandardScaler.transform from stored mean/scale vectors."""
+
+    def __init__(self, columns, mean, scale):
+        self.columns = list(columns)
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, df):
+        return (np.asarray(df, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class PackedRegressor:
+    """Thin predict() wrapper over a native xgboost.Booster."""
+
+    def __init__(self, booster):
+        self._booster = booster
+
+    def get_booster(self):
+        return self._booster
+
+    def predict(self, X):
+        return self._booster.inplace_predict(np.asarray(X, dtype=np.float32))
+
+
+def write_package(boosters=None, encoders=None, encoder_name="all-MiniLM-L6-v2",
+                  embedding_dim=None, feature_layouts=None, package_dir=PACKAGE_DIR):
+    """Add or replace artifacts in the package and rewrite its manifest.
+
+    ``boosters`` maps booster name -> fitted XGBRegressor; ``encoders`` maps
+    "ohe"/"ohe_duration" -> fitted OneHotEncoder and "scaler" -> StandardScaler.
+    ``feature_layouts`` maps booster name -> the encoder names its design
+    matrix was built from, in column order after the embedding, e.g.
+    ``{"low": ["ohe", "scaler"], "duration": ["ohe_duration"]}``.
+    """
+    boosters = boosters or {}
+    encoders = encoders or {}
+    feature_layouts = feature_layouts or {}
+    with _write_lock:
+        manifest_path = os.path.join(package_dir, MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        else:
+            manifest = {"format_version": FORMAT_VERSION, "files": {}, "boosters": {}, "encoders": {}}
+        files = manifest["files"]
+
+        for name, enc in encoders.items():
+            entry = {"columns": [str(c) for c in getattr(enc, "feature_names_in_", [])], "files": []}
+            if name == "scaler":
+                scale = enc.scale_ if enc.scale_ is not None else np.ones_like(enc.mean_)
+                arrays = {"mean": np.asarray(enc.mean_, dtype=np.float64),
+                          "scale": np.asarray(scale, dtype=np.float64)}
+            else:
+                if getattr(enc, "drop", None) is not None or getattr(enc, "max_categories", None):
+                    raise ValueError(f"{name}: only plain one-hot encoders can be packaged")
+                arrays = {f"categories_{i}": _category_array(c) for i, c in enumerate(enc.categories_)}
+            for key, array in arrays.items():
+                rel = f"{name}/{key}.npy"
+                _atomic_save_npy(os.path.join(package_dir, rel), array)
+                files[rel] = _sha256(os.path.join(package_dir, rel))
+                entry["files"].append(rel)
+            entry["fingerprint"] = hashlib.sha256(
+                "".join(files[rel] for rel in entry["files"]).encode()
+            ).hexdigest()
+            manifest["encoders"][name] = entry
+
+        for name, model in boosters.items():
+            booster = model.get_booster() if hasattr(model, "get_booster") else model
+            rel = f"{name}.ubj"
+            _atomic_write_bytes(os.path.join(package_dir, rel), bytes(booster.save_raw("ubj")))
+            files[rel] = _sha256(os.path.join(package_dir, rel))
+            layout = feature_layouts.get(name, [])
+            manifest["boosters"][name] = {
+                "file": rel,
+                "num_features": int(booster.num_features()),
+                "embedding_dim": embedding_dim,
+                "encoders": {enc: manifest["encoders"][enc]["fingerprint"] for enc in layout},
+            }
+
+        manifest.update({
+            "format_version": FORMAT_VERSION,
+            "encoder_name": encoder_name,
+            "updated": datetime.now(timezone.utc).isoformat(),
+        })
+        # Manifest goes last: readers never see entries whose files aren't in place
+        _atomic_write_bytes(manifest_path, json.dumps(manifest, indent=2).encode("utf-8"))
+        return manifest
+
+
+class ArtifactPackage:
+    """Read side of the package; used by model_loading.ModelRegistry when present."""
+
+    def __init__(self, package_dir=PACKAGE_DIR, verify=True):
+        self.package_dir = package_dir
+        self.verify = verify
+        with open(os.path.join(package_dir, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != FORMAT_VERSION:
+            raise ArtifactIntegrityError(
+                f"Unsupported package format {self.manifest.get('format_version')}, expected {FORMAT_VERSION}"
+            )
+
+    @staticmethod
+    def exists(package_dir=PACKAGE_DIR):
+        return os.path.exists(os.path.join(package_dir, MANIFEST))
+
+    @property
+    def encoder_name(self):
+        return self.manifest.get("encoder_name")
+
+    def has(self, name):
+        return name in self.manifest["boosters"] or name in self.manifest["encoders"]
+
+    def file_bytes(self, name):
+        if name in self.manifest["boosters"]:
+            rels = [self.manifest["boosters"][name]["file"]]
+        else:
+            rels = self.manifest["encoders"][name]["files"]
+        return sum(os.path.getsize(os.path.join(self.package_dir, r)) for r in rels)
+
+    def _path(self, rel):
+        path = os.path.join(self.package_dir, rel)
+        if self.verify and _sha256(path) != self.manifest["files"].get(rel):
+            raise ArtifactIntegrityError(f"{rel} does not match the hash recorded in the manifest")
+        return path
+
+    def load(self, name):
+        if name in self.manifest["boosters"]:
+            return self._load_booster(name)
+        return self._load_encoder(name)
+
+    def _load_encoder(self, name):
+        entry = self.manifest["encoders"][name]
+        arrays = [np.load(self._path(rel), mmap_mode="r", allow_pickle=False) for rel in entry["files"]]
+        if name == "scaler":
+            return PackedScaler(entry["columns"], arrays[0], arrays[1])
+        return PackedOneHotEncoder(entry["columns"], arrays)
+
+    def _load_booster(self, name):
+        import xgboost as xgb
+
+        entry = self.manifest["boosters"][name]
+        for enc, fingerprint in entry["encoders"].items():
+            current = self.manifest["encoders"].get(enc, {}).get("fingerprint")
+            if current != fingerprint:
+                raise ArtifactIntegrityError(
+                    f"{name} booster was trained with a different '{enc}' than the one packaged; retrain or repackage"
+                )
+        with open(self._path(entry["file"]), "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            booster = xgb.Booster()
+            booster.load_model(bytearray(buf))
+        if booster.num_features() != entry["num_features"]:
+            raise ArtifactIntegrityError(f"{name} booster feature count differs from the manifest")
+        if entry.get("embedding_dim"):
+            expected = entry["embedding_dim"] + sum(self._encoder_width(enc) for enc in entry["encoders"])
+            if expected != entry["num_features"]:
+                raise ArtifactIntegrityError(
+                    f"{name} booster expects {entry['num_features']} features but the packaged "
+                    f"layout produces {expected}"
+                )
+        return PackedRegressor(booster)
+
+    def _encoder_width(self, name):
+        entry = self.manifest["encoders"][name]
+        shapes = [np.load(os.path.join(self.package_dir, rel), mmap_mode="r").shape for rel in entry["files"]]
+        if name == "scaler":
+            return shapes[0][0]
+        return sum(shape[0] for shape in shapes)
+
+
+def package_pickles(model_dir="models", package_dir=PACKAGE_DIR, encoder_name="all-MiniLM-L6-v2"):
+    """Convert the legacy models/*.pkl files into a package."""
+    import pickle
+
+    def load(filename):
+        path = os.path.join(model_dir, filename)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    encoders = {name: load(f"{name}.pkl") for name in ("ohe", "scaler", "ohe_duration")}
+    encoders = {k: v for k, v in encoders.items() if v is not None}
+    boosters = {name: load(f"{name}_custom.pkl") for name in ("low", "mid", "high")}
+    boosters["duration"] = load("duration_model.pkl")
+    boosters = {k: v for k, v in boosters.items() if v is not None}
+    layouts = {name: ["ohe", "scaler"] for name in boosters if name != "duration"}
+    if "duration" in boosters:
+        layouts["duration"] = ["ohe_duration"]
+
+    # The pickles don't record the embedding size; recover it from the layout
+    manifest = write_package(encoders=encoders, encoder_name=encoder_name, package_dir=package_dir)
+    package = ArtifactPackage(package_dir)
+    for name, model in boosters.items():
+        width = sum(package._encoder_width(enc) for enc in layouts[name])
+        n_features = int(model.get_booster().num_features())
+        manifest = write_package(boosters={name: model}, encoder_name=encoder_name,
+                                 embedding_dim=n_features - width,
+                                 feature_layouts={name: layouts[name]}, package_dir=package_dir)
+    return manifest
+
+
+if __name__ == "__main__":
+    manifest = package_pickles()
+    print(f"✅ Packaged {', '.join(manifest['boosters'])} and {', '.join(manifest['encoders'])} into {PACKAGE_DIR}")
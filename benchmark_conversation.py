@@ -0,0 +1,157 @@
+"""Replay the seven-question conversation and plan generation, reporting per-step latency.
+
+By default a local stand-in (mock_mistral_server.py) is started in-process, so
+no API key is needed. Model time is simulated, which means wall time minus
+model time is the app-side overhead:
+
+    python benchmark_conversation.py [--latency 0.3] [--tokens-per-second 0] [--repeats 3]
+    python benchmark_conversation.py --server-url https://api.mistral.ai   # real API
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from chat_history import compact_messages, message_tokens
+from llm_cache import CachedMistralClient, ResponseCache
+from llm_orchestrator import submit, join
+from mistral_client import ResilientMistral, TokenBucket
+from mock_mistral_server import start_server, canned_reply, simulated_seconds
+from prompts import MODEL, QUESTIONS, question_system_prompt, plan_messages, duration_messages
+from question_engine import QuestionEngine
+from estimation import PHASE_MAPPING, get_engine
+from stream_json import parse_plan_stream
+
+SAMPLE_ANSWERS = {
+    "ProjectDescription": "New 5-story public elementary school with gymnasium and cafeteria.",
+    "Location": "Brooklyn",
+    "Grades": "6",
+    "StudentsPerClass": "25",
+    "Timeline": "36",
+    "SquareFootage": "120000",
+    "SpecialReqs": "Rooftop solar and an accessible playground.",
+}
+
+
+def timed_stream(chunks):
+    """Drain a text stream; returns ``(text, time_to_first_chunk, total_seconds)``."""
+    start = time.perf_counter()
+    first = None
+    parts = []
+    for chunk in chunks:
+        if first is None:
+            first = time.perf_counter() - start
+        parts.append(chunk)
+    total = time.perf_counter() - start
+    return "".join(parts), first if first is not None else total, total
+
+
+def replay(client, model_time, llm_questions=False, local_durations=False):
+    """One full conversation; returns ``[(step, first_token_s, total_s, model_s, prompt_tokens)]``.
+
+    The guided questions go through the local QuestionEngine as in the app,
+    or, with ``llm_questions``, through the LLM-phrased prompt they replaced.
+    Phase durations come from the LLM, or with ``local_durations`` from the
+    trained duration model as in the app (needs the model artifacts).
+    """
+    steps = []
+    collected_info = {key: None for key, _ in QUESTIONS}
+    history = []
+    last_key = None
+    engine = QuestionEngine()
+    # The app's first turn is the user's greeting; every later turn answers the last question
+    for turn in range(len(QUESTIONS) + 1):
+        user_input = SAMPLE_ANSWERS[last_key] if last_key else "Yes, please help me plan a new school."
+        history.append({"role": "user", "content": user_input})
+        if not llm_questions:
+            start = time.perf_counter()
+            if last_key:
+                collected_info[last_key] = engine.answer(last_key, user_input).value
+            last_key, reply = engine.reply(collected_info)
+            total = time.perf_counter() - start
+            history.append({"role": "assistant", "content": reply})
+            steps.append((f"question {turn + 1}" if last_key else "summary", total, total, 0.0, 0))
+            continue
+        if last_key:
+            collected_info[last_key] = user_input
+        last_key, next_question = engine.next_question(collected_info)
+        messages = compact_messages(question_system_prompt(collected_info, next_question), history)
+        reply, first, total = timed_stream(client.chat.stream_text(model=MODEL, messages=messages))
+        history.append({"role": "assistant", "content": reply.strip()})
+        steps.append((f"question {turn + 1}" if next_question else "summary", first, total,
+                      model_time(messages), message_tokens(messages)))
+
+    plan_msgs = plan_messages(collected_info)
+    duration_msgs = duration_messages(collected_info["ProjectDescription"], PHASE_MAPPING)
+    start = time.perf_counter()
+    if local_durations:
+        description = collected_info["ProjectDescription"]
+        durations_future = submit(lambda: get_engine().model_durations_batch([description]))
+    else:
+        durations_future = submit(lambda: client.chat.complete(model=MODEL, messages=duration_msgs))
+    first_phase = []
+    plan, parser = parse_plan_stream(
+        client.chat.stream_text(model=MODEL, messages=plan_msgs),
+        on_phase=lambda phase: first_phase.append(time.perf_counter() - start) if not first_phase else None,
+    )
+    plan_seconds = time.perf_counter() - start
+    calls = join({"durations": durations_future})
+    total = time.perf_counter() - start
+    if parser.truncated or not calls["durations"].ok:
+        raise RuntimeError(f"plan truncated={parser.truncated}, durations error={calls['durations'].error}")
+    steps.append(("plan stream", first_phase[0] if first_phase else plan_seconds, plan_seconds,
+                  model_time(plan_msgs), message_tokens(plan_msgs)))
+    if local_durations:
+        duration_msgs = []
+    steps.append(("plan + durations", first_phase[0] if first_phase else total, total,
+                  max(model_time(plan_msgs), model_time(duration_msgs) if duration_msgs else 0.0),
+                  message_tokens(plan_msgs) + message_tokens(duration_msgs)))
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--server-url", help="benchmark this endpoint instead of the local stand-in")
+    parser.add_argument("--latency", type=float, default=0.0, help="stand-in seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="stand-in generation rate, 0 = instant")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--llm-questions", action="store_true",
+                        help="phrase the guided questions with the LLM, as the app did before QuestionEngine")
+    parser.add_argument("--local-durations", action="store_true",
+                        help="take phase durations from the trained duration model instead of the LLM")
+    parser.add_argument("--cache", action="store_true",
+                        help="keep the response cache across repeats (measures cached replays)")
+    args = parser.parse_args()
+
+    if args.server_url:
+        server_url = args.server_url
+        model_time = lambda messages: 0.0
+    else:
+        server, server_url = start_server(latency=args.latency, tokens_per_second=args.tokens_per_second)
+        model_time = lambda messages: simulated_seconds(canned_reply(messages), args.latency, args.tokens_per_second)
+    api_key = os.environ.get("MISTRAL_API_KEY", "local")
+
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(args.repeats):
+            # A fresh cache per run unless --cache, so every request reaches the server
+            cache_path = os.path.join(tmp, "responses.sqlite3" if args.cache else f"responses-{i}.sqlite3")
+            # The app's pooled transport, minus the rate limiter so it doesn't skew timings
+            client = CachedMistralClient(ResilientMistral(api_key, server_url, limiter=TokenBucket(rate=0)),
+                                         cache=ResponseCache(path=cache_path))
+            runs.append(replay(client, model_time, args.llm_questions, args.local_durations))
+
+    print(f"Server: {server_url}  repeats: {args.repeats}  (median of runs)")
+    print(f"{'step':<20}{'first ms':>10}{'total ms':>11}{'model ms':>11}{'overhead ms':>13}{'tokens in':>11}")
+    for i, (step, *_, tokens) in enumerate(runs[0]):
+        first = statistics.median(run[i][1] for run in runs)
+        total = statistics.median(run[i][2] for run in runs)
+        model = statistics.median(run[i][3] for run in runs)
+        print(f"{step:<20}{first * 1e3:>10.1f}{total * 1e3:>11.1f}{model * 1e3:>11.1f}{(total - model) * 1e3:>13.1f}{tokens:>11}")
+    conversation = statistics.median(sum(step[2] for step in run[:-2]) + run[-1][2] for run in runs)
+    print(f"{'end to end':<20}{'':>10}{conversation * 1e3:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Compare XGBoost's predict against the compiled NumPy tree evaluator.
+
+Usage: python benchmark_tree_eval.py [--repeats 200] [--rows 1 5 100 1000]
+
+SOLACE_NATIVE_MAX_ROWS (the batch size up to which SOLACE_TREE_EVALUATOR=native
+uses the compiled forest) belongs just below the row count where the speedup
+drops under 1x.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from model_loading import ModelRegistry, MissingArtifactError
+from tree_compiler import compile_booster
+
+
+def time_call(fn, repeats):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 5, 100, 1000])
+    parser.add_argument("--rtol", type=float, default=1e-5)
+    args = parser.parse_args()
+
+    registry = ModelRegistry(tree_evaluator="xgboost")
+    rng = np.random.default_rng(42)
+
+    print(f"{'model':<10}{'rows':>7}{'xgboost ms':>13}{'native ms':>12}{'speedup':>10}{'max |diff|':>14}")
+    for name in ["low", "mid", "high", "duration"]:
+        try:
+            model = registry.get(name)
+        except MissingArtifactError as e:
+            print(f"{name:<10} skipped: {e}")
+            continue
+        forest = compile_booster(model)
+        for n_rows in args.rows:
+            X = rng.normal(size=(n_rows, forest.num_features)).astype(np.float32)
+            expected = model.predict(X)
+            got = forest.predict(X)
+            max_diff = float(np.max(np.abs(expected - got)))
+            scale = max(float(np.max(np.abs(expected))), 1.0)
+            status = "" if max_diff <= args.rtol * scale else "  MISMATCH"
+
+            t_xgb = time_call(lambda: model.predict(X), args.repeats)
+            t_native = time_call(lambda: forest.predict(X), args.repeats)
+            print(f"{name:<10}{n_rows:>7}{t_xgb * 1e3:>13.3f}{t_native * 1e3:>12.3f}"
+                  f"{t_xgb / t_native:>9.1f}x{max_diff:>14.4g}{status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Bounded prompts for the question-asking turns.
+
+The question prompt already carries the collected_info JSON, so the model
+doesn't need the whole transcript: the last exchange plus a one-line-per-turn
+summary of what the user said earlier is enough. ``compact_messages`` builds
+that and trims it to a token budget, so the prompt size per turn stays flat
+however long the conversation runs. The full transcript stays in
+st.session_state.chat_history for display.
+"""
+import os
+
+TOKEN_BUDGET = int(os.environ.get("SOLACE_CHAT_TOKEN_BUDGET", 1200))
+KEEP_EXCHANGES = int(os.environ.get("SOLACE_CHAT_KEEP_EXCHANGES", 1))
+SUMMARY_CHARS = 200  # per earlier user message
+MESSAGE_OVERHEAD_TOKENS = 4  # role and separators
+
+
+def estimate_tokens(text):
+    """~4 characters per token; close enough for budgeting English prompts."""
+    return (len(text or "") + 3) // 4
+
+
+def _role_content(message):
+    if isinstance(message, dict):
+        return message.get("role"), message.get("content") or ""
+    return getattr(message, "role", None), getattr(message, "content", None) or ""
+
+
+def message_tokens(messages):
+    return sum(estimate_tokens(_role_content(m)[1]) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def _shorten(text, limit):
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def compact_messages(system_prompt, history, budget=TOKEN_BUDGET, keep_exchanges=KEEP_EXCHANGES):
+    """System prompt, a summary of older user turns, and the last ``keep_exchanges`` exchanges.
+
+    ``history`` is the full transcript ending with the current user message
+    (mistralai message objects or role/content dicts). Returns role/content
+    dicts no larger than ``budget`` tokens where possible: summary lines go
+    first (oldest first), then the kept replies are shortened. The system
+    prompt and the current user message are never dropped.
+    """
+    history = [_role_content(m) for m in history]
+    # Start the kept window on a user message: [user, assistant] * k + [current user]
+    keep = min(len(history), 2 * keep_exchanges + 1)
+    while keep < len(history) and history[-keep][0] != "user":
+        keep += 1
+    older, recent = history[:len(history) - keep], history[len(history) - keep:]
+    summary = [f"- {_shorten(content, SUMMARY_CHARS)}" for role, content in older if role == "user" and content.strip()]
+
+    def build():
+        system = system_prompt
+        if summary:
+            system += "\n    Earlier user messages (summarised):\n" + "\n".join(summary)
+        return [{"role": "system", "content": system}] + [{"role": r, "content": c} for r, c in recent]
+
+    messages = build()
+    while summary and message_tokens(messages) > budget:
+        summary.pop(0)
+        messages = build()
+    # Still over: shorten the kept messages before the current one, longest first
+    for i in sorted(range(len(recent) - 1), key=lambda i: -len(recent[i][1])):
+        over = message_tokens(messages) - budget
+        if over <= 0:
+            break
+        role, content = recent[i]
+        recent[i] = (role, _shorten(content, max(40, len(content) - 4 * over)))
+        messages = build()
+    return messages
+
+
+def record_usage(log, messages):
+    """Append the estimated input tokens for one call to ``log``; returns the count."""
+    tokens = message_tokens(messages)
+    log.append(tokens)
+    return tokens
@@ -0,0 +1,103 @@
+"""K-fold evaluation for the tuning objective.
+
+``FoldMatrices`` splits a design matrix into k folds once and quantizes each
+fold's training and validation rows into a ``QuantileDMatrix`` pair. A tuning
+worker builds it once and evaluates every trial on the same matrices. The
+folds of a trial train in parallel threads (XGBoost releases the GIL while
+training), but never more at once than the worker has threads: with fewer
+threads than folds they take turns, so the worker stays within its share of
+the cores.
+
+Trials are ranked by ``joint_score``, which adds serving cost to accuracy. It
+is the mean fold RMSE divided by the target's standard deviation (so weeks
+and dollars are on one scale), plus ``LATENCY_WEIGHT`` times trees × depth
+relative to the largest model in the search space. Predicting with deep,
+many-tree boosters is what makes app inference slow. Set
+``SOLACE_LATENCY_WEIGHT=0`` to rank by RMSE alone.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+CV_FOLDS = int(os.environ.get("SOLACE_CV_FOLDS", 5))
+LATENCY_WEIGHT = float(os.environ.get("SOLACE_LATENCY_WEIGHT", 0.1))
+# Largest trees × depth in tuning.suggest_params (300 trees of depth 15)
+MAX_LATENCY_PROXY = 300 * 15
+
+
+def latency_proxy(n_trees, max_depth):
+    """Relative inference cost of a booster: nodes visited per row grow with trees × depth."""
+    return int(n_trees) * int(max_depth)
+
+
+def joint_score(rmse, y_scale, n_trees, max_depth, latency_weight=LATENCY_WEIGHT):
+    """Normalised RMSE plus the weighted, normalised latency proxy (lower is better)."""
+    return rmse / y_scale + latency_weight * latency_proxy(n_trees, max_depth) / MAX_LATENCY_PROXY
+
+
+def _stop_callback(on_iteration, stop):
+    from xgboost.callback import TrainingCallback
+
+    class FoldCallback(TrainingCallback):
+        """Passes each tree's validation RMSE to ``on_iteration``; stops when ``stop`` is set."""
+
+        def after_iteration(self, model, epoch, evals_log):
+            if on_iteration is not None:
+                scores = evals_log.get("validation_0", {}).get("rmse")
+                if scores and on_iteration(epoch, float(scores[-1])):
+                    stop.set()
+            return stop.is_set()
+
+    return FoldCallback()
+
+
+class FoldMatrices:
+    """Prebuilt per-fold QuantileDMatrix pairs, reused across trials."""
+
+    def __init__(self, X, y, folds=CV_FOLDS, max_bin=256, threads=1, seed=42):
+        import xgboost as xgb
+        from sklearn.model_selection import KFold
+
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=np.float32)
+        self.threads = threads
+        self.y_scale = float(np.std(y)) or 1.0
+        self.folds = []
+        for train_idx, val_idx in KFold(n_splits=max(2, folds), shuffle=True, random_state=seed).split(X):
+            dtrain = xgb.QuantileDMatrix(X[train_idx], y[train_idx], max_bin=max_bin, nthread=threads)
+            dval = xgb.QuantileDMatrix(X[val_idx], y[val_idx], ref=dtrain, nthread=threads)
+            self.folds.append((dtrain, dval))
+
+    def evaluate(self, params, rounds, on_iteration=None):
+        """Train ``params`` for ``rounds`` trees on every fold, up to ``threads`` folds at once.
+
+        ``on_iteration(tree, rmse)`` is called with the first fold's validation
+        RMSE after each tree; returning True stops all folds. Returns
+        ``{"rmse", "fold_rmse", "trees", "stopped"}``.
+        """
+        import xgboost as xgb
+
+        stop = threading.Event()
+        # Folds at once × threads per fold stays within the worker's thread budget
+        parallel = max(1, min(len(self.folds), self.threads))
+        params = {**params, "nthread": max(1, self.threads // parallel), "eval_metric": "rmse"}
+
+        def run(i):
+            dtrain, dval = self.folds[i]
+            history = {}
+            booster = xgb.train(params, dtrain, num_boost_round=rounds, evals=[(dval, "validation_0")],
+                                evals_result=history, verbose_eval=False,
+                                callbacks=[_stop_callback(on_iteration if i == 0 else None, stop)])
+            return float(history["validation_0"]["rmse"][-1]), booster.num_boosted_rounds()
+
+        with ThreadPoolExecutor(max_workers=parallel) as pool:
+            results = list(pool.map(run, range(len(self.folds))))
+        fold_rmse = [rmse for rmse, _ in results]
+        return {
+            "rmse": float(np.mean(fold_rmse)),
+            "fold_rmse": fold_rmse,
+            "trees": max(trees for _, trees in results),
+            "stopped": stop.is_set(),
+        }
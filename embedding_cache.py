@@ -0,0 +1,225 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
+CACHE_DIR = os.environ.get("SOLACE_EMBEDDING_CACHE_DIR", os.path.join("cache", "embeddings"))
+MEMORY_ITEMS = int(os.environ.get("SOLACE_EMBEDDING_CACHE_ITEMS", 4096))
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different inputs share one cache entry."""
+    return " ".join(str(text).split())
+
+
+def text_hash(text):
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Two-tier cache in front of a sentence encoder.
+
+    Tier 1 is an in-memory LRU of recent vectors. Tier 2 is an append-only
+    float32 file opened with np.memmap, alongside a text file holding one hash
+    per row, so vectors survive restarts and are shared between processes.
+    Entries are keyed by (encoder name, normalized text hash); each encoder
+    gets its own directory.
+    """
+
+    def __init__(self, encoder_factory, encoder_name, cache_dir=CACHE_DIR,
+                 memory_items=MEMORY_ITEMS, persist=True):
+        self._encoder_factory = encoder_factory
+        self.encoder_name = encoder_name
+        self.memory_items = memory_items
+        self.persist = persist
+        self.dir = os.path.join(cache_dir, re.sub(r"[^\w.-]", "_", encoder_name))
+        self._vectors_path = os.path.join(self.dir, "vectors.f32")
+        self._hashes_path = os.path.join(self.dir, "hashes.txt")
+        self._lock_path = os.path.join(self.dir, ".lock")
+
+        self._memory = OrderedDict()
+        self._disk_index = {}
+        self._disk_rows = 0
+        self._hashes_offset = 0
+        self._memmap = None
+        self.dim = None
+        self._lock = threading.RLock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        if self.persist:
+            os.makedirs(self.dir, exist_ok=True)
+            self._sync_disk_index()
+
+    # --- disk tier ---
+
+    def _file_lock(self):
+        return _FileLock(self._lock_path) if fcntl else _NullLock()
+
+    def _sync_disk_index(self):
+        """Pick up rows appended since the last sync (possibly by another process)."""
+        if not os.path.exists(self._hashes_path):
+            return
+        with open(self._hashes_path, "r", encoding="ascii") as f:
+            f.seek(self._hashes_offset)
+            tail = f.read()
+        # Only consume complete lines; a partially written one is picked up later
+        complete = tail[:tail.rfind("\n") + 1]
+        self._hashes_offset += len(complete)
+        for h in complete.splitlines():
+            if h.startswith("#dim="):
+                self.dim = int(h[5:])
+                continue
+            self._disk_index.setdefault(h, self._disk_rows)
+            self._disk_rows += 1
+        self._memmap = None
+
+    def _disk_vectors(self):
+        if self._memmap is None and self._disk_rows and self.dim:
+            self._memmap = np.memmap(self._vectors_path, dtype=np.float32, mode="r",
+                                     shape=(self._disk_rows, self.dim))
+        return self._memmap
+
+    def _append_to_disk(self, hashes, vectors):
+        with self._file_lock():
+            self._sync_disk_index()
+            fresh = [(h, v) for h, v in zip(hashes, vectors) if h not in self._disk_index]
+            if not fresh:
+                return
+            # Drop whatever a writer that died mid-append left behind: vector
+            # bytes whose hash line never made it to disk (appending after them
+            # would shift every later row) and a partial last hash line.
+            for path, size in ((self._vectors_path, self._disk_rows * self.dim * 4),
+                               (self._hashes_path, self._hashes_offset)):
+                if os.path.exists(path) and os.path.getsize(path) > size:
+                    with open(path, "r+b") as f:
+                        f.truncate(size)
+            self._memmap = None
+            # Vectors are written before their hashes so an index row never
+            # points past the end of the data file.
+            with open(self._vectors_path, "ab") as f:
+                for _, v in fresh:
+                    f.write(np.asarray(v, dtype=np.float32).tobytes())
+            with open(self._hashes_path, "a", encoding="ascii") as f:
+                if self._disk_rows == 0 and self._hashes_offset == 0:
+                    f.write(f"#dim={self.dim}\n")
+                f.write("".join(h + "\n" for h, _ in fresh))
+            self._sync_disk_index()
+
+    # --- memory tier ---
+
+    def _remember(self, h, vector):
+        self._memory[h] = vector
+        self._memory.move_to_end(h)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, h):
+        vector = self._memory.get(h)
+        if vector is not None:
+            self._memory.move_to_end(h)
+            self.counters["memory_hits"] += 1
+            return vector
+        if self.persist:
+            row = self._disk_index.get(h)
+            if row is None:
+                self._sync_disk_index()
+                row = self._disk_index.get(h)
+            vectors = self._disk_vectors() if row is not None else None
+            if vectors is not None and row < len(vectors):
+                vector = np.array(vectors[row])
+                self._remember(h, vector)
+                self.counters["disk_hits"] += 1
+                return vector
+        return None
+
+    # --- public API ---
+
+    def encode(self, texts, **kwargs):
+        """Drop-in for SentenceTransformer.encode on a list of strings."""
+        texts = [normalize_text(t) for t in texts]
+        hashes = [text_hash(t) for t in texts]
+        with self._lock:
+            found = {}
+            missing = {}
+            for h, t in zip(hashes, texts):
+                if h in found or h in missing:
+                    continue
+                vector = self._lookup(h)
+                if vector is None:
+                    missing[h] = t
+                else:
+                    found[h] = vector
+            self.counters["misses"] += len(missing)
+
+        if missing:
+            encoded = np.asarray(
+                self._encoder_factory().encode(list(missing.values()), **kwargs), dtype=np.float32
+            )
+            with self._lock:
+                self.dim = self.dim or encoded.shape[1]
+                for h, vector in zip(missing, encoded):
+                    found[h] = vector
+                    self._remember(h, vector)
+                if self.persist:
+                    self._append_to_disk(list(missing), encoded)
+
+        if not hashes:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return np.stack([found[h] for h in hashes])
+
+    def stats(self):
+        with self._lock:
+            lookups = sum(self.counters.values())
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            return {
+                **self.counters,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk_index),
+            }
+
+
+class _FileLock:
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        self._f = open(self.path, "a")
+        fcntl.flock(self._f, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self._f, fcntl.LOCK_UN)
+        self._f.close()
+
+
+class _NullLock:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache():
+    """Process-wide EmbeddingCache in front of the registry's shared encoder."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            from model_loading import get_registry
+            registry = get_registry()
+            # Resolve the name first: the cache directory is keyed on it
+            _cache = EmbeddingCache(registry.encoder, registry.resolve_encoder_name())
+        return _cache
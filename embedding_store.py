@@ -0,0 +1,138 @@
+"""Deduplicated description embeddings for the training scripts.
+
+Most rows of the capital projects CSV repeat a description (one project has
+Scope, Design, Construction... rows), so the trainers used to encode the same
+text several times per run and again on every run. ``EmbeddingStore`` encodes
+each distinct text once, keeps the vectors in a float32 ``.npy`` file opened
+with ``mmap_mode="r"`` and builds design matrices by gathering rows by index.
+The encoder is only loaded when a text isn't in the store yet.
+
+Layout of ``cache/training_embeddings/<encoder>/``::
+
+    vectors.npy     (n, dim) float32 embeddings, append-only across runs
+    hashes.txt      text hash of each row, in row order
+    meta.json       encoder name, dimension, row count (written last)
+"""
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+from artifacts import atomic_write, write_text
+from embedding_cache import text_hash
+
+STORE_DIR = os.environ.get("SOLACE_TRAINING_EMBEDDINGS_DIR", os.path.join("cache", "training_embeddings"))
+ENCODE_BATCH = 512
+
+
+class EmbeddingStore:
+    """On-disk, hash-indexed embedding matrix with one row per distinct text."""
+
+    def __init__(self, encoder_factory, encoder_name, store_dir=STORE_DIR, batch_size=ENCODE_BATCH):
+        self._encoder_factory = encoder_factory
+        self.encoder_name = encoder_name
+        self.dir = os.path.join(store_dir, re.sub(r"[^\w.-]", "_", encoder_name))
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self.vectors = None
+        self.index = {}
+        self.dim = None
+        self.counters = {"rows": 0, "distinct": 0, "stored": 0, "encoded": 0}
+        os.makedirs(self.dir, exist_ok=True)
+        self._load()
+
+    def _path(self, name):
+        return os.path.join(self.dir, name)
+
+    def _load(self):
+        try:
+            with open(self._path("meta.json")) as f:
+                meta = json.load(f)
+            vectors = np.load(self._path("vectors.npy"), mmap_mode="r")
+            with open(self._path("hashes.txt"), encoding="ascii") as f:
+                hashes = f.read().split()
+        except (OSError, ValueError):
+            return
+        if meta.get("encoder_name") != self.encoder_name:
+            return
+        # Rows are only ever appended, so any common prefix of the two files is consistent
+        rows = min(len(hashes), vectors.shape[0])
+        self.vectors = vectors
+        self.index = {h: i for i, h in enumerate(hashes[:rows])}
+        self.dim = vectors.shape[1]
+
+    def _append(self, hashes, encoded):
+        old = self.vectors
+        old_rows = len(self.index)
+        all_hashes = list(self.index) + hashes  # index is in row order
+        dim = encoded.shape[1]
+
+        def write_vectors(tmp):
+            out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(len(all_hashes), dim))
+            if old_rows:
+                out[:old_rows] = old[:old_rows]
+            out[old_rows:] = encoded
+            out.flush()
+            del out
+
+        atomic_write(self._path("vectors.npy"), write_vectors)
+        atomic_write(self._path("hashes.txt"), lambda tmp: write_text(tmp, "\n".join(all_hashes) + "\n"))
+        meta = {"encoder_name": self.encoder_name, "dim": dim, "rows": len(all_hashes)}
+        atomic_write(self._path("meta.json"), lambda tmp: write_text(tmp, json.dumps(meta, indent=2)))
+        self.vectors = np.load(self._path("vectors.npy"), mmap_mode="r")
+        self.index = {h: i for i, h in enumerate(all_hashes)}
+        self.dim = dim
+
+    def rows(self, texts):
+        """Store row of each text (an int64 array), encoding texts not stored yet."""
+        texts = [str(t) for t in texts]
+        hashes = [text_hash(t) for t in texts]
+        with self._lock:
+            missing = {}
+            for h, t in zip(hashes, texts):
+                if h not in self.index and h not in missing:
+                    missing[h] = t
+            encoded = []
+            if missing:
+                encoder = self._encoder_factory()
+                pending = list(missing.values())
+                for start in range(0, len(pending), self.batch_size):
+                    encoded.append(np.asarray(
+                        encoder.encode(pending[start:start + self.batch_size], show_progress_bar=False),
+                        dtype=np.float32))
+                self._append(list(missing), np.vstack(encoded))
+            self.counters["rows"] += len(hashes)
+            self.counters["distinct"] += len(set(hashes))
+            self.counters["encoded"] += len(missing)
+            self.counters["stored"] = len(self.index)
+            return np.fromiter((self.index[h] for h in hashes), dtype=np.int64, count=len(hashes))
+
+    def gather(self, texts):
+        """``(len(texts), dim)`` float32 embeddings, one row per text, duplicates included."""
+        rows = self.rows(texts)
+        if self.vectors is None:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return np.take(self.vectors, rows, axis=0)
+
+    def stats(self):
+        with self._lock:
+            rows = self.counters["rows"]
+            return {
+                **self.counters,
+                "duplication_ratio": round(rows / self.counters["distinct"], 2) if self.counters["distinct"] else 0.0,
+            }
+
+
+def training_store(encoder_name="all-MiniLM-L6-v2", store_dir=STORE_DIR):
+    """Store for the trainers; the SentenceTransformer loads only if something needs encoding."""
+    encoder = []
+
+    def load_encoder():
+        if not encoder:
+            from sentence_transformers import SentenceTransformer
+            encoder.append(SentenceTransformer(encoder_name))
+        return encoder[0]
+
+    return EmbeddingStore(load_encoder, encoder_name, store_dir)
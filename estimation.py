@@ -0,0 +1,182 @@
+import os
+import threading
+
+import pandas as pd
+
+from embedding_cache import get_embedding_cache
+from features import build_cost_features, build_duration_features, phase_rows
+from model_loading import MissingArtifactError, get_registry
+from plan_schema import to_weeks
+
+# === Phase Mapping ===
+# Model phase code -> display name shown to users
+PHASE_MAPPING = {
+    "I. Scope": "I. Site Preperation",
+    "II. Design": "II. Foundation",
+    "III. Commissioning": "III. Commissioning",
+    "IV. Purch & Install": "IV. Purch & Install",
+    "V. Construction": "V. Construction"
+}
+
+
+# Phase code -> "Project Phase Name" the cost and duration models were trained on
+# (commissioning work is recorded under construction management, "CM,F&E")
+TRAINING_PHASE_NAMES = {
+    "I. Scope": "Scope",
+    "II. Design": "Design",
+    "III. Commissioning": "CM,F&E",
+    "IV. Purch & Install": "Purch & Install",
+    "V. Construction": "Construction",
+}
+
+# Weight of externally supplied (LLM) durations when blending with the duration
+# model: 0 uses the model alone, 1 uses the supplied value wherever there is one
+LLM_DURATION_WEIGHT = float(os.environ.get("SOLACE_LLM_DURATION_WEIGHT", 0))
+
+
+def parse_duration_weeks(raw_val):
+    # "12 weeks", "8-10 weeks" (midpoint), "3 months" -> weeks; 0 if there's no number
+    return to_weeks(raw_val)
+
+
+class EstimationEngine:
+    """ML cost/duration estimation, independent of Streamlit.
+
+    Models come from the process-wide registry and embeddings from the shared
+    embedding cache, so any number of engines (app sessions, the HTTP service,
+    batch jobs) reuse the same loaded artifacts.
+    """
+
+    def __init__(self, registry=None, embedder=None, phase_mapping=PHASE_MAPPING):
+        self.registry = registry or get_registry()
+        self.embedder = embedder or get_embedding_cache()
+        self.phase_mapping = phase_mapping
+
+    def preprocessors(self):
+        return self.registry.get("ohe"), self.registry.get("scaler"), self.registry.get("ohe_duration")
+
+    def warm(self, buckets=("high",)):
+        """Load encoders, the requested bucket models and the sentence encoder up front."""
+        self.preprocessors()
+        for bucket in buckets:
+            self.registry.bucket_model(bucket)
+        self.embedder.encode(["warm up"])
+
+    def prepare_single_row(self, description, phase, duration_weeks):
+        ohe, scaler, _ = self.preprocessors()
+        return build_cost_features(self.embedder, ohe, scaler, [description], [phase], [duration_weeks])
+
+    def prepare_features_for_duration(self, description, phase_name):
+        _, _, ohe_duration = self.preprocessors()
+        return build_duration_features(self.embedder, ohe_duration, [description], [phase_name])
+
+    def predict_durations_batch(self, descriptions, phases):
+        """Duration-model weeks for N (description, phase) rows in one predict call.
+
+        Phases may be app codes ("I. Scope") or the CSV names the encoder was
+        fitted on ("Scope"); codes are mapped, so they don't encode as all zeros.
+        """
+        _, _, ohe_duration = self.preprocessors()
+        phases = [TRAINING_PHASE_NAMES.get(p, p) for p in phases]
+        X = build_duration_features(self.embedder, ohe_duration, descriptions, phases)
+        weeks = self.registry.get("duration").predict(X)
+        return [max(float(w), 0.0) for w in weeks]
+
+    def predict_costs(self, descriptions, phases, durations_weeks, bucket):
+        """Cost-model USD for N (description, phase, weeks) rows; returns ``(costs, bucket_used)``.
+
+        Phases are mapped like in ``predict_durations_batch``.
+        """
+        model, used_bucket = self.registry.bucket_model(bucket)
+        ohe, scaler, _ = self.preprocessors()
+        phases = [TRAINING_PHASE_NAMES.get(p, p) for p in phases]
+        X = build_cost_features(self.embedder, ohe, scaler, descriptions, phases, durations_weeks)
+        return [max(float(c), 0.0) for c in model.predict(X)], used_bucket
+
+    def model_durations_batch(self, descriptions):
+        """Duration-model weeks for every phase of every description, in one predict call.
+
+        Returns one ``{phase_code: weeks}`` dict per description.
+        """
+        phase_codes = list(self.phase_mapping)
+        rows_desc, rows_phase = phase_rows(descriptions, phase_codes)
+        weeks = self.predict_durations_batch(rows_desc, rows_phase)
+        n_phases = len(phase_codes)
+        return [dict(zip(phase_codes, weeks[i * n_phases:(i + 1) * n_phases])) for i in range(len(descriptions))]
+
+    def resolve_durations_batch(self, descriptions, durations_list=None, llm_weight=LLM_DURATION_WEIGHT):
+        """Weeks per phase from the duration model, blended with or falling back to supplied estimates.
+
+        ``durations_list[i]`` holds optional external (e.g. LLM) estimates for
+        ``descriptions[i]``. They are blended in with ``llm_weight`` and used
+        on their own only when the duration model isn't available. Returns
+        ``(list of {phase_code: weeks}, source)`` with source "model", "blend"
+        or "external".
+        """
+        durations_list = durations_list or [{}] * len(descriptions)
+        try:
+            model_list = self.model_durations_batch(descriptions)
+            source = "blend" if llm_weight > 0 and any(durations_list) else "model"
+        except MissingArtifactError:
+            model_list = [None] * len(descriptions)
+            source = "external"
+
+        resolved = []
+        for model, given in zip(model_list, durations_list):
+            weeks = {}
+            for phase_code in self.phase_mapping:
+                external = parse_duration_weeks((given or {}).get(phase_code))
+                if model is None:
+                    weeks[phase_code] = external
+                elif external > 0 and llm_weight > 0:
+                    weeks[phase_code] = llm_weight * external + (1 - llm_weight) * model[phase_code]
+                else:
+                    weeks[phase_code] = model[phase_code]
+            resolved.append(weeks)
+        return resolved, source
+
+    def predict_cost_duration(self, description, bucket, durations=None, llm_weight=LLM_DURATION_WEIGHT):
+        """Phase table for one description; returns ``(result_df, bucket_used)``."""
+        results, used_bucket = self.predict_cost_duration_batch([description], bucket, [durations], llm_weight)
+        return results[0], used_bucket
+
+    def predict_cost_duration_batch(self, descriptions, bucket, durations_list=None, llm_weight=LLM_DURATION_WEIGHT):
+        """Score every phase of every description with one feature build and one predict call.
+
+        Phase durations come from the duration model (one batched pass over
+        all phases), with ``durations_list[i]`` (phase code -> weeks, numbers
+        or strings such as "12 weeks") blended in per ``resolve_durations_batch``.
+        Returns ``(list_of_dfs, bucket_used)``.
+        """
+        phase_codes = list(self.phase_mapping)
+        rows_desc, rows_phase = phase_rows(descriptions, phase_codes)
+        resolved, _ = self.resolve_durations_batch(descriptions, durations_list, llm_weight)
+        rows_weeks = [weeks[phase_code] for weeks in resolved for phase_code in phase_codes]
+        costs, used_bucket = self.predict_costs(rows_desc, rows_phase, rows_weeks, bucket)
+
+        results = []
+        n_phases = len(phase_codes)
+        for i in range(len(descriptions)):
+            predictions = []
+            for j, phase_code in enumerate(phase_codes):
+                k = i * n_phases + j
+                predictions.append({
+                    "Phase": self.phase_mapping[phase_code],
+                    "Predicted Duration (weeks)": round(rows_weeks[k], 2),
+                    "Predicted Cost (USD)": round(costs[k], 2),
+                })
+            results.append(pd.DataFrame(predictions))
+        return results, used_bucket
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Process-wide EstimationEngine."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = EstimationEngine()
+        return _engine
@@ -0,0 +1,193 @@
+"""Cleaned, typed feature table shared by the training scripts and the app.
+
+Parsing the capital projects CSV (three date columns, status derivation,
+spend/inflation columns, description cleaning and stopword removal) happens
+once per CSV version. The result is cached in ``cache/features/`` as Parquet,
+or as a pickle when pyarrow isn't installed, under a key made from the CSV's
+sha256 and FEATURE_VERSION. A retrain loop on an unchanged CSV goes straight
+to the cached table.
+
+The app (reference figures, similar projects) asks for ``clean_text=False``:
+the same table without the stopword-cleaned description columns, so it never
+needs nltk or its stopwords corpus.
+
+Bump FEATURE_VERSION whenever ``build_feature_table`` changes.
+"""
+import hashlib
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from artifacts import atomic_write
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # no Parquet engine: cache as pickle instead
+    pyarrow = None
+
+FEATURE_VERSION = 1
+CACHE_DIR = os.environ.get("SOLACE_FEATURE_CACHE_DIR", os.path.join("cache", "features"))
+
+# The committed CSV carries a " (1)" download suffix; either name is accepted
+DATA_PATHS = [
+    "data/Capital_Project_Schedules_and_Budgets.csv",
+    "data/Capital_Project_Schedules_and_Budgets (1).csv",
+]
+
+DATE_FORMAT = "%m/%d/%Y"
+INFLATION_MAP = {2020: 1.18, 2021: 1.14, 2022: 1.10, 2023: 1.06, 2024: 1.00, 2025: 0.97}
+
+
+def resolve_data_path(path=None):
+    """``path``, else $SOLACE_DATA_CSV, else the first of DATA_PATHS that exists."""
+    candidates = [path] if path else [os.environ.get("SOLACE_DATA_CSV")] + DATA_PATHS
+    for candidate in candidates:
+        if candidate and os.path.exists(candidate):
+            return candidate
+    raise FileNotFoundError(f"Capital projects CSV not found (tried {', '.join(c for c in candidates if c)})")
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _stop_words():
+    import nltk
+
+    try:
+        return set(nltk.corpus.stopwords.words("english"))
+    except LookupError:
+        nltk.download("stopwords", quiet=True)
+        return set(nltk.corpus.stopwords.words("english"))
+
+
+def clean_descriptions(descriptions, stop_words):
+    """Vectorised clean_text + stopword removal, run once per distinct description.
+
+    Same result as the trainers' former row-wise version: lowercase, strip
+    punctuation, collapse whitespace, then drop stopword tokens.
+    """
+    raw = descriptions.astype(str)
+    unique = pd.Series(raw.unique())
+    clean = (unique.str.lower()
+             .str.replace(r"[^\w\s]", "", regex=True)
+             .str.replace(r"\s+", " ", regex=True)
+             .str.strip())
+    # Cleaned text is \w+ tokens separated by single spaces, so \b...\b matches whole tokens
+    pattern = r"\b(?:" + "|".join(sorted(map(re.escape, stop_words), key=len, reverse=True)) + r")\b"
+    no_stop = clean.str.replace(pattern, "", regex=True).str.split().str.join(" ")
+    clean_map = dict(zip(unique, clean))
+    no_stop_map = dict(zip(unique, no_stop))
+    return raw.map(clean_map), raw.map(no_stop_map)
+
+
+def build_feature_table(raw, stop_words=None, clean_text=True):
+    """Typed, cleaned table with every column either trainer or the app derives from the CSV.
+
+    ``clean_text=False`` leaves out ``description_clean`` and
+    ``description_no_stopwords`` (the only columns that need nltk).
+    """
+    df = raw.copy()
+    df.columns = df.columns.str.strip()
+    start = pd.to_datetime(df["Project Phase Actual Start Date"], errors="coerce", format=DATE_FORMAT)
+    actual_end = pd.to_datetime(df["Project Phase Actual End Date"], errors="coerce", format=DATE_FORMAT)
+    planned_end = pd.to_datetime(df["Project Phase Planned End Date"], errors="coerce", format=DATE_FORMAT)
+    end = actual_end.combine_first(planned_end)
+
+    out = pd.DataFrame({
+        "Project Description": df["Project Description"],
+        "Project Phase Name": df["Project Phase Name"].fillna("Unknown"),
+        "Project Type": df["Project Type"].astype(str).str.strip(),
+        "Project Building Identifier": df["Project Building Identifier"].astype(str).str.strip(),
+        "Project School Name": df["Project School Name"].fillna("").astype(str).str.strip(),
+        "project_status": df["Project Status Name"].str.strip().str.upper(),
+        "phase_start_date": start,
+        "phase_end_date": end,
+    })
+    # Not-started phases only carry planned dates; they don't count as durations
+    not_started = out["project_status"] == "PNS"
+    out["start_date"] = start.mask(not_started)
+    out["end_date"] = end.mask(not_started)
+    out["end_date_missing"] = out["end_date"].isna()
+    out["duration_days"] = (out["end_date"] - out["start_date"]).dt.days
+    out["timeline_status"] = np.select(
+        [not_started, out["end_date"].isna()], ["Not Started", "Incomplete"], default="Available")
+
+    out["actual_spend"] = pd.to_numeric(df["Total Phase Actual Spending Amount"], errors="coerce")
+    out["estimated_spend"] = pd.to_numeric(df["Final Estimate of Actual Costs Through End of Phase Amount"], errors="coerce")
+    out["budgeted_spend"] = pd.to_numeric(df["Project Budget Amount"], errors="coerce")
+    out["final_cost"] = (out["actual_spend"].combine_first(out["estimated_spend"])
+                         .combine_first(out["budgeted_spend"]).fillna(0))
+    out["fiscal_year_num"] = df["Project Description"].str.extract(r"FY(\d{2})", expand=False).astype(float) + 2000
+    out["inflation_factor"] = out["fiscal_year_num"].map(INFLATION_MAP)
+    out["adjusted_cost"] = out["final_cost"] * out["inflation_factor"]
+    out["cost_to_predict"] = out["adjusted_cost"].combine_first(out["final_cost"])
+
+    if not clean_text:
+        return out
+    clean, no_stop = clean_descriptions(df["Project Description"], stop_words or _stop_words())
+    out["description_clean"] = clean
+    out["description_no_stopwords"] = no_stop.fillna("")
+    return out
+
+
+def _cache_path(csv_hash, cache_dir, clean_text=True):
+    ext = "parquet" if pyarrow is not None else "pkl"
+    kind = "" if clean_text else "-base"
+    return os.path.join(cache_dir, f"features-v{FEATURE_VERSION}{kind}-{csv_hash[:16]}.{ext}")
+
+
+def _write_table(table, path):
+    if path.endswith(".parquet"):
+        table.to_parquet(path, index=False)
+    else:
+        table.to_pickle(path)
+
+
+def _read(path):
+    return pd.read_parquet(path) if path.endswith(".parquet") else pd.read_pickle(path)
+
+
+_tables = {}
+_lock = threading.Lock()
+
+
+def load_feature_table(csv_path=None, cache_dir=CACHE_DIR, clean_text=True):
+    """The cleaned feature table for the CSV, from memory, the on-disk cache, or built and cached.
+
+    With ``clean_text=False`` an already cached full table is reused;
+    otherwise the lighter table is built without touching nltk.
+    """
+    csv_path = resolve_data_path(csv_path)
+    csv_hash = file_sha256(csv_path)
+    full_path = _cache_path(csv_hash, cache_dir)
+    path = full_path if clean_text else _cache_path(csv_hash, cache_dir, clean_text=False)
+    with _lock:
+        for candidate in dict.fromkeys([path, full_path]):
+            if candidate in _tables:
+                return _tables[candidate].copy()
+        if os.path.exists(path):
+            table = _read(path)
+        elif not clean_text and os.path.exists(full_path):
+            path, table = full_path, _read(full_path)
+        else:
+            table = build_feature_table(pd.read_csv(csv_path), clean_text=clean_text)
+            atomic_write(path, lambda tmp: _write_table(table, tmp))
+        _tables[path] = table
+        return table.copy()
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    table = load_feature_table()
+    print(f"✅ Feature table: {len(table):,} rows × {table.shape[1]} columns in {time.perf_counter() - start:.2f}s "
+          f"({_cache_path(file_sha256(resolve_data_path()), CACHE_DIR)})")
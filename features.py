@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+COST_CAT_COLS = ["Project Phase Name", "project_status", "timeline_status", "end_date_missing"]
+COST_NUM_COLS = ["duration_days"]
+DURATION_CAT_COLS = ["Project Phase Name", "project_status", "timeline_status"]
+
+
+def encode_descriptions(encoder, descriptions):
+    """Embed a list of descriptions, encoding each distinct text only once."""
+    unique = list(dict.fromkeys(descriptions))
+    row_of = {text: i for i, text in enumerate(unique)}
+    embeddings = np.asarray(encoder.encode(unique))
+    return embeddings[[row_of[text] for text in descriptions]]
+
+
+def build_cost_features(encoder, ohe, scaler, descriptions, phases, durations_weeks):
+    """Cost-model design matrix for N (description, phase, duration) rows.
+
+    Column layout matches train_cost_model.prepare_features:
+    [embedding | one-hot categoricals | scaled duration_days].
+    """
+    df = pd.DataFrame({
+        "Project Phase Name": list(phases),
+        "project_status": "Complete",
+        "timeline_status": "Complete",
+        "end_date_missing": True,
+        "duration_days": np.asarray(durations_weeks, dtype=float) * 7,
+    })
+    embeddings = encode_descriptions(encoder, list(descriptions))
+    cat_feats = ohe.transform(df[COST_CAT_COLS])
+    num_feats = scaler.transform(df[COST_NUM_COLS])
+    return np.hstack([embeddings, cat_feats, num_feats])
+
+
+def build_duration_features(encoder, ohe_duration, descriptions, phases):
+    """Duration-model design matrix for N (description, phase) rows."""
+    df = pd.DataFrame({
+        "Project Phase Name": list(phases),
+        "project_status": "Complete",
+        "timeline_status": "Complete",
+    })
+    embeddings = encode_descriptions(encoder, list(descriptions))
+    cat_feats = ohe_duration.transform(df[DURATION_CAT_COLS])
+    return np.hstack([embeddings, cat_feats])
+
+
+def phase_rows(descriptions, phase_codes):
+    """Cross every description with every phase: returns parallel (descriptions, phases) lists."""
+    rows_desc = [d for d in descriptions for _ in phase_codes]
+    rows_phase = [p for _ in descriptions for p in phase_codes]
+    return rows_desc, rows_phase
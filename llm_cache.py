@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_PATH = os.environ.get("SOLACE_LLM_CACHE_PATH", os.path.join("cache", "llm_responses.sqlite3"))
+TTL_SECONDS = float(os.environ.get("SOLACE_LLM_CACHE_TTL", 24 * 3600))
+MAX_ENTRIES = int(os.environ.get("SOLACE_LLM_CACHE_MAX_ENTRIES", 5000))
+MAX_MB = float(os.environ.get("SOLACE_LLM_CACHE_MAX_MB", 50))
+
+
+def _canonical_message(message):
+    if isinstance(message, dict):
+        role, content = message.get("role"), message.get("content")
+    else:
+        role, content = getattr(message, "role", None), getattr(message, "content", None)
+    if isinstance(content, str):
+        content = content.strip()
+    return {"role": role, "content": content}
+
+
+# Request options that don't change the generated text
+TRANSPORT_PARAMS = {"timeout_ms", "retries", "server_url", "http_headers"}
+
+
+def cache_key(model, messages, **params):
+    """Stable hash of the model, the role/content of each message and any extra parameters."""
+    payload = {
+        "model": model,
+        "messages": [_canonical_message(m) for m in messages],
+        "params": {k: v for k, v in params.items() if v is not None and k not in TRANSPORT_PARAMS},
+    }
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class _Message:
+    def __init__(self, content):
+        self.role = "assistant"
+        self.content = content
+
+
+class _Choice:
+    def __init__(self, content):
+        self.index = 0
+        self.message = _Message(content)
+        self.finish_reason = "stop"
+
+
+class CachedResponse:
+    """Enough of a chat completion response for ``response.choices[0].message.content``."""
+
+    def __init__(self, model, content, cached):
+        self.model = model
+        self.choices = [_Choice(content)]
+        self.cached = cached
+
+
+class ResponseCache:
+    """SQLite-backed store of chat completion texts with TTL and size-bounded LRU eviction."""
+
+    def __init__(self, path=CACHE_PATH, ttl_seconds=TTL_SECONDS,
+                 max_entries=MAX_ENTRIES, max_mb=MAX_MB):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+        self.saved_seconds = 0.0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                   key TEXT PRIMARY KEY,
+                   model TEXT,
+                   content TEXT,
+                   created REAL,
+                   last_access REAL,
+                   latency REAL,
+                   size INTEGER
+               )"""
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, created, latency FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+            content, created, latency = row
+            if now - created > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.counters["expired"] += 1
+                self.counters["misses"] += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.counters["hits"] += 1
+            self.saved_seconds += latency or 0.0
+            return content
+
+    def put(self, key, model, content, latency):
+        now = time.time()
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, content, now, now, latency, size),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _evict(self):
+        self._conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,))
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        while count > self.max_entries or (total > self.max_bytes and count > 1):
+            key, size = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access ASC LIMIT 1"
+            ).fetchone()
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.counters["evictions"] += 1
+            count -= 1
+            total -= size
+
+    def stats(self):
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_rate": round(self.counters["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": count,
+                "bytes": total,
+                "network_seconds_saved": round(self.saved_seconds, 2),
+            }
+
+
+def _finished(choice):
+    """True if the model ended the reply itself (not cut off by length, an error or a tool call)."""
+    reason = getattr(choice, "finish_reason", None)
+    return str(getattr(reason, "value", reason)).lower() == "stop"
+
+
+class _CachedChat:
+    """Only complete replies (finish_reason "stop") are stored; callers ``evict``
+    a stored reply that turns out to be unusable so a retry regenerates it."""
+
+    def __init__(self, chat, cache):
+        self._chat = chat
+        self._cache = cache
+
+    def complete(self, model, messages, **params):
+        key = cache_key(model, messages, **params)
+        content = self._cache.get(key)
+        if content is not None:
+            return CachedResponse(model, content, cached=True)
+        start = time.perf_counter()
+        response = self._chat.complete(model=model, messages=messages, **params)
+        content = response.choices[0].message.content
+        if content and _finished(response.choices[0]):
+            self._cache.put(key, model, content, time.perf_counter() - start)
+        return response
+
+    def stream_text(self, model, messages, **params):
+        """Yield reply text as it is generated (``chat.stream``), caching the full reply.
+
+        A cached reply is yielded in one piece. The reply is only stored once
+        the stream has been consumed to the end and the model finished it.
+        """
+        key = cache_key(model, messages, **params)
+        content = self._cache.get(key)
+        if content is not None:
+            yield content
+            return
+        start = time.perf_counter()
+        parts = []
+        finished = False
+        for event in self._chat.stream(model=model, messages=messages, **params):
+            choices = event.data.choices
+            delta = choices[0].delta.content if choices else None
+            if isinstance(delta, str) and delta:
+                parts.append(delta)
+                yield delta
+            if choices and getattr(choices[0], "finish_reason", None) is not None:
+                finished = _finished(choices[0])
+        if parts and finished:
+            self._cache.put(key, model, "".join(parts), time.perf_counter() - start)
+
+    def evict(self, model, messages, **params):
+        """Forget the stored reply for this request (e.g. it didn't parse)."""
+        self._cache.delete(cache_key(model, messages, **params))
+
+    def __getattr__(self, name):
+        return getattr(self._chat, name)
+
+
+class CachedMistralClient:
+    """Wraps a ``mistralai.Mistral`` client so identical chat requests are served from cache."""
+
+    def __init__(self, client, cache=None):
+        self._client = client
+        self.cache = cache or get_response_cache()
+        self.chat = _CachedChat(client.chat, self.cache)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Process-wide ResponseCache shared by every session."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
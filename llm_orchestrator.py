@@ -0,0 +1,66 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Upper bound on in-flight LLM requests across all sessions in this process
+MAX_CONCURRENT_CALLS = int(os.environ.get("SOLACE_LLM_MAX_CONCURRENCY", 8))
+DEFAULT_TIMEOUT = float(os.environ.get("SOLACE_LLM_TIMEOUT", 120))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide bounded thread pool for LLM calls."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_CALLS, thread_name_prefix="llm")
+        return _executor
+
+
+class CallResult:
+    """Outcome of one concurrently issued call."""
+
+    def __init__(self, value=None, error=None, seconds=0.0):
+        self.value = value
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+def submit(fn):
+    """Start ``fn`` on the shared pool; returns a Future of ``(value, seconds)``."""
+    return get_executor().submit(_timed, fn)
+
+
+def join(futures, timeout=DEFAULT_TIMEOUT):
+    """Wait for named futures from ``submit`` and return ``{name: CallResult}``.
+
+    Futures still pending after ``timeout`` seconds are cancelled (if not yet
+    started) and reported with a TimeoutError; one call failing or timing out
+    never discards the results of the others.
+    """
+    done, not_done = wait(list(futures.values()), timeout=timeout)
+    results = {}
+    for name, future in futures.items():
+        if future in not_done:
+            future.cancel()
+            results[name] = CallResult(error=TimeoutError(f"{name} did not finish within {timeout:.0f}s"))
+            continue
+        try:
+            value, seconds = future.result()
+            results[name] = CallResult(value=value, seconds=seconds)
+        except Exception as e:
+            results[name] = CallResult(error=e)
+    return results
@@ -0,0 +1,174 @@
+"""Process-wide Mistral client shared by every Streamlit session.
+
+One ``mistralai.Mistral`` instance per (API key, server URL) sits on a
+keep-alive ``httpx`` connection pool, so sessions reuse TCP/TLS connections
+instead of opening new ones on every rerun. Each call gets a deadline,
+retries 429/5xx responses and transport errors with jittered exponential
+backoff (honouring ``Retry-After``), and first takes a token from a
+rate limiter shared by all sessions, so a burst of users queues briefly
+instead of tripping the API's rate limit.
+"""
+import os
+import random
+import threading
+import time
+
+import httpx
+
+from llm_cache import CachedMistralClient
+from llm_orchestrator import DEFAULT_TIMEOUT
+
+RATE_PER_SECOND = float(os.environ.get("SOLACE_LLM_RATE", 2))
+BURST = int(os.environ.get("SOLACE_LLM_BURST", 4))
+MAX_RETRIES = int(os.environ.get("SOLACE_LLM_MAX_RETRIES", 3))
+BACKOFF_SECONDS = float(os.environ.get("SOLACE_LLM_BACKOFF", 0.5))
+MAX_BACKOFF_SECONDS = float(os.environ.get("SOLACE_LLM_MAX_BACKOFF", 8))
+POOL_CONNECTIONS = int(os.environ.get("SOLACE_LLM_POOL_SIZE", 20))
+CONNECT_TIMEOUT = 10.0
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` requests per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate=RATE_PER_SECOND, capacity=BURST):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+
+    def acquire(self, deadline=None):
+        """Block until a token is available; False if it can't be had before ``deadline``."""
+        if self.rate <= 0:
+            return True
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self.waited_seconds += now - start
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+def _status_code(error):
+    status = getattr(error, "status_code", None)
+    if status is None and isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+    return status
+
+
+def _retry_after(error):
+    response = getattr(error, "raw_response", None) or getattr(error, "response", None)
+    value = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error):
+    """429/5xx responses and connection-level failures are worth another attempt."""
+    return isinstance(error, httpx.TransportError) or _status_code(error) in RETRY_STATUS
+
+
+class ResilientChat:
+    """``chat.complete``/``chat.stream`` with a deadline, retries and the shared rate limiter."""
+
+    def __init__(self, chat, limiter, max_retries=MAX_RETRIES):
+        self._chat = chat
+        self._limiter = limiter
+        self.max_retries = max_retries
+        self.counters = {"calls": 0, "retries": 0, "failures": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _call(self, fn, timeout_ms=None, **params):
+        timeout = timeout_ms / 1000 if timeout_ms else DEFAULT_TIMEOUT
+        deadline = time.monotonic() + timeout
+        self._count("calls")
+        attempt = 0
+        while True:
+            if not self._limiter.acquire(deadline):
+                self._count("failures")
+                raise TimeoutError(f"Mistral rate limit queue exceeded the {timeout:.0f}s deadline")
+            remaining = deadline - time.monotonic()
+            try:
+                return fn(timeout_ms=max(1, int(remaining * 1000)), **params)
+            except Exception as e:
+                delay = _retry_after(e) or random.uniform(0, min(MAX_BACKOFF_SECONDS, BACKOFF_SECONDS * 2 ** attempt))
+                if (attempt >= self.max_retries or not is_retryable(e)
+                        or time.monotonic() + delay >= deadline):
+                    self._count("failures")
+                    raise
+                attempt += 1
+                self._count("retries")
+                time.sleep(delay)
+
+    def complete(self, **params):
+        return self._call(self._chat.complete, **params)
+
+    def stream(self, **params):
+        """Retries cover opening the stream; once events flow, an error is passed through."""
+        return self._call(self._chat.stream, **params)
+
+    def __getattr__(self, name):
+        return getattr(self._chat, name)
+
+
+class ResilientMistral:
+    """A pooled ``mistralai.Mistral`` whose ``chat`` goes through ResilientChat."""
+
+    def __init__(self, api_key, server_url=None, limiter=None, pool_connections=POOL_CONNECTIONS):
+        from mistralai import Mistral
+
+        self.http = httpx.Client(
+            limits=httpx.Limits(max_connections=pool_connections,
+                                max_keepalive_connections=pool_connections),
+            timeout=httpx.Timeout(DEFAULT_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+        self._client = Mistral(api_key=api_key, server_url=server_url or None, client=self.http)
+        self.limiter = limiter or get_rate_limiter()
+        self.chat = ResilientChat(self._client.chat, self.limiter)
+
+    def stats(self):
+        return {**self.chat.counters, "rate_limit_wait_seconds": round(self.limiter.waited_seconds, 2)}
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+_limiter = None
+_clients = {}
+_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Process-wide token bucket shared by every client and session."""
+    global _limiter
+    with _lock:
+        if _limiter is None:
+            _limiter = TokenBucket()
+        return _limiter
+
+
+def get_client(api_key, server_url=None):
+    """Process-wide cached, pooled, rate-limited client for this key and endpoint."""
+    limiter = get_rate_limiter()
+    with _lock:
+        key = (api_key, server_url or None)
+        if key not in _clients:
+            _clients[key] = CachedMistralClient(ResilientMistral(api_key, server_url, limiter=limiter))
+        return _clients[key]
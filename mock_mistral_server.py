@@ -0,0 +1,197 @@
+"""Local stand-in for the Mistral chat completion API.
+
+Speaks the same ``POST /v1/chat/completions`` protocol the ``mistralai``
+client uses (JSON responses and server-sent-event streaming), with canned
+replies and configurable latency, so the chat flow can run and be benchmarked
+without an API key:
+
+    python mock_mistral_server.py --port 8089 --latency 0.5 --tokens-per-second 60
+    MISTRAL_SERVER_URL=http://127.0.0.1:8089 streamlit run app.py
+"""
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Same codes and display names as estimation.PHASE_MAPPING, kept inline so the
+# stand-in starts without pandas or the model stack
+PHASE_MAPPING = {
+    "I. Scope": "I. Site Preperation",
+    "II. Design": "II. Foundation",
+    "III. Commissioning": "III. Commissioning",
+    "IV. Purch & Install": "IV. Purch & Install",
+    "V. Construction": "V. Construction",
+}
+
+CANNED_PLAN = {
+    "ConstructionPhases": [
+        {
+            "PhaseName": display_name,
+            "Description": f"{display_name} work for the new school building.",
+            "EstimatedCost": 1500000 + 500000 * i,
+            "DurationEstimate": 8 + 6 * i,
+            "Subtasks": [
+                {
+                    "SubtaskName": f"{display_name} task {j + 1}",
+                    "Description": "Canned subtask from the local Mistral stand-in.",
+                    "CostEstimate": 150000 + 10000 * j,
+                    "DurationEstimate": 2 + j,
+                    "LaborCategories": ["General Laborer"],
+                    "Vendors": ["Turner Construction"],
+                    "Permissions": ["SCA"],
+                }
+                for j in range(5)
+            ],
+            "LaborCategories": ["General Laborer", "Electrician"],
+            "Vendors": ["Turner Construction"],
+            "Permissions": ["SCA", "DoE"],
+        }
+        for i, display_name in enumerate(PHASE_MAPPING.values())
+    ],
+    "Resources & Materials": {
+        "Structural": [
+            {"Item": "Structural steel (Foundation, Construction)", "QuantityEstimate": "400 metric tonnes", "EstimatedCost": 1200000},
+            {"Item": "Ready-mix concrete (Foundation)", "QuantityEstimate": "3000 cubic yards", "EstimatedCost": 600000},
+        ],
+    },
+}
+
+CANNED_DURATIONS = {code: f"{8 + 6 * i} weeks" for i, code in enumerate(PHASE_MAPPING)}
+
+CANNED_QUESTION_REPLY = (
+    "Thanks, noted. For reference, a typical NYC public school project runs 3-4 years "
+    "from scope to completion. Please answer the next guided question."
+)
+
+
+def canned_reply(messages):
+    """Pick a reply by recognising which of the app's prompts was sent."""
+    text = " ".join(str(m.get("content", "")) for m in messages)
+    if "ConstructionPhases" in text:
+        return json.dumps(CANNED_PLAN, indent=2)
+    if "duration in weeks" in text:
+        return json.dumps(CANNED_DURATIONS, indent=2)
+    return CANNED_QUESTION_REPLY
+
+
+def tokenize(text):
+    """Rough word-piece split used for streaming and token counts."""
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+def simulated_seconds(text, latency, tokens_per_second):
+    """Model time the stand-in spends on ``text``: first-token latency plus generation."""
+    generation = len(tokenize(text)) / tokens_per_second if tokens_per_second > 0 else 0.0
+    return latency + generation
+
+
+class MockMistralHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    tokens_per_second = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send_json(404, {"message": f"unknown path {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"message": "invalid JSON body"})
+            return
+
+        messages = request.get("messages", [])
+        model = request.get("model", "mistral-medium")
+        content = canned_reply(messages)
+        tokens = tokenize(content)
+        prompt_tokens = sum(len(tokenize(str(m.get("content", "")))) for m in messages)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(tokens),
+            "total_tokens": prompt_tokens + len(tokens),
+        }
+        base = {"id": uuid.uuid4().hex, "model": model, "created": int(time.time())}
+
+        time.sleep(self.latency)
+        if not request.get("stream"):
+            if self.tokens_per_second > 0:
+                time.sleep(len(tokens) / self.tokens_per_second)
+            self._send_json(200, {
+                **base,
+                "object": "chat.completion",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content, "tool_calls": None},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        for i, token in enumerate(tokens):
+            last = i == len(tokens) - 1
+            chunk = {
+                **base,
+                "object": "chat.completion.chunk",
+                "choices": [{
+                    "index": 0,
+                    "delta": {"role": "assistant", "content": token},
+                    "finish_reason": "stop" if last else None,
+                }],
+            }
+            if last:
+                chunk["usage"] = usage
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            if self.tokens_per_second > 0:
+                time.sleep(1 / self.tokens_per_second)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def start_server(host="127.0.0.1", port=0, latency=0.0, tokens_per_second=0.0):
+    """Start the stand-in on a background thread; returns ``(server, base_url)``."""
+    handler = type("ConfiguredMockMistralHandler", (MockMistralHandler,), {
+        "latency": latency,
+        "tokens_per_second": tokens_per_second,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Mistral chat completion stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=60.0, help="0 streams instantly")
+    args = parser.parse_args()
+    server, url = start_server(args.host, args.port, args.latency, args.tokens_per_second)
+    print(f"Mock Mistral API listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,19 +1,237 @@
 import os
 import pickle
+import threading
+import time
+from collections import OrderedDict
 
-def load_models():
-    base_path = "models"
+from artifacts import ArtifactIntegrityError, ArtifactPackage
+
+MODEL_DIR = "models"
+ENCODER_NAME = "all-MiniLM-L6-v2"
+
+# Upper bound for resident cost-bucket models, overridable per deployment
+BUCKET_MEMORY_BUDGET_MB = float(os.environ.get("SOLACE_BUCKET_MEMORY_MB", 64))
+
+# "native" scores small batches (the app's few rows per estimate) with
+# tree_compiler.CompiledForest and larger ones (bulk scoring) with XGBoost
+TREE_EVALUATOR = os.environ.get("SOLACE_TREE_EVALUATOR", "xgboost")
+BOOSTERS = {"low", "mid", "high", "duration"}
+
+# Which bucket to try next when a bucket's model file is missing
+BUCKET_FALLBACKS = {
+    "low": ["mid", "high"],
+    "mid": ["high", "low"],
+    "high": ["mid", "low"],
+}
+
+# Registry name -> legacy pickle file under MODEL_DIR. When models/package/
+# (see artifacts.py) exists it takes precedence over these pickles.
+ARTIFACTS = {
+    "low": "low_custom.pkl",
+    "mid": "mid_custom.pkl",
+    "high": "high_custom.pkl",
+    "duration": "duration_model.pkl",
+    "ohe": "ohe.pkl",
+    "ohe_duration": "ohe_duration.pkl",
+    "scaler": "scaler.pkl",
+}
+
+
+class MissingArtifactError(FileNotFoundError):
+    """Raised when a model artifact is not present in the models directory."""
+
+
+def _rss_bytes():
+    """Current resident set size of this process, or 0 if it can't be read."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class ModelRegistry:
+    """Loads every model artifact at most once per process and shares it.
+
+    Streamlit re-executes app.py on every interaction, so anything loaded at
+    module level is paid for again on each rerun. The registry keeps the
+    unpickled objects (and the sentence encoder) alive for the lifetime of the
+    server process and records how long each one took to load.
+    """
+
+    def __init__(self, base_path=MODEL_DIR, encoder_name=ENCODER_NAME,
+                 bucket_budget_mb=BUCKET_MEMORY_BUDGET_MB, tree_evaluator=TREE_EVALUATOR):
+        self.base_path = base_path
+        self.package_dir = os.path.join(base_path, "package")
+        self._artifact_package = None
+        self.tree_evaluator = tree_evaluator
+        self.encoder_name = encoder_name
+        self.bucket_budget_bytes = int(bucket_budget_mb * 1024 * 1024)
+        self._artifacts = {}
+        # Cost-bucket boosters, least recently used first
+        self._buckets = OrderedDict()
+        self._stats = {}
+        self._evictions = 0
+        self._lock = threading.RLock()
+
+    def _load(self, name, loader):
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        obj = loader()
+        self._stats[name] = {
+            "load_seconds": round(time.perf_counter() - start, 4),
+            "rss_delta_bytes": max(_rss_bytes() - rss_before, 0),
+        }
+        return obj
+
+    def _package(self):
+        """The versioned artifact package, if one has been written under base_path."""
+        if self._artifact_package is None and ArtifactPackage.exists(self.package_dir):
+            self._artifact_package = ArtifactPackage(self.package_dir)
+        return self._artifact_package
+
+    def _load_pickle(self, name):
+        package = self._package()
+        if package is not None and package.has(name):
+            def load_packaged():
+                obj = package.load(name)
+                if self.tree_evaluator == "native" and name in BOOSTERS:
+                    from tree_compiler import SmallBatchForest
+                    obj = SmallBatchForest(obj)
+                return obj
+
+            obj = self._load(name, load_packaged)
+            self._stats[name]["file_bytes"] = package.file_bytes(name)
+            self._stats[name]["source"] = "package"
+            return obj
 
-    def load_pickle(filename):
-        with open(os.path.join(base_path, filename), "rb") as f:
-            return pickle.load(f)
+        path = os.path.join(self.base_path, ARTIFACTS[name])
+        if not os.path.exists(path):
+            raise MissingArtifactError(f"{ARTIFACTS[name]} not found in {self.base_path}")
 
-    model_low = load_pickle("low_custom.pkl")
-    model_mid = load_pickle("mid_custom.pkl")
-    model_high = load_pickle("high_custom.pkl")
-    duration_model = load_pickle("duration_model.pkl")
-    ohe = load_pickle("ohe.pkl")
-    ohe_duration = load_pickle("ohe_duration.pkl")
-    scaler = load_pickle("scaler.pkl")
+        def load_pickle():
+            with open(path, "rb") as f:
+                obj = pickle.load(f)
+            if self.tree_evaluator == "native" and name in BOOSTERS:
+                from tree_compiler import SmallBatchForest
+                obj = SmallBatchForest(obj)
+            return obj
 
-    return model_low, model_mid, model_high, duration_model, ohe, ohe_duration, scaler
\ No newline at end of file
+        obj = self._load(name, load_pickle)
+        self._stats[name]["file_bytes"] = os.path.getsize(path)
+        self._stats[name]["source"] = "pickle"
+        return obj
+
+    def available(self, name):
+        package = self._package()
+        if package is not None and package.has(name):
+            return True
+        return os.path.exists(os.path.join(self.base_path, ARTIFACTS[name]))
+
+    def get(self, name):
+        """Return the artifact registered under ``name`` (see ARTIFACTS).
+
+        Cost-bucket models are loaded on first use and kept in an LRU bounded
+        by ``bucket_budget_bytes``; everything else stays resident once loaded.
+        """
+        with self._lock:
+            if name in BUCKET_FALLBACKS:
+                return self._get_bucket(name)
+            if name not in self._artifacts:
+                self._artifacts[name] = self._load_pickle(name)
+            return self._artifacts[name]
+
+    def _bucket_bytes(self, name):
+        # The serialized size tracks a booster's footprint. The RSS delta doesn't:
+        # the first bucket loaded also pays for importing xgboost (~150 MB),
+        # which would make every later load evict it.
+        return self._stats.get(name, {}).get("file_bytes", 0)
+
+    def _get_bucket(self, name):
+        if name in self._buckets:
+            self._buckets.move_to_end(name)
+            return self._buckets[name]
+        model = self._load_pickle(name)
+        self._buckets[name] = model
+        # Evict older buckets until we're back under budget, but always keep
+        # the one that was just requested.
+        while (len(self._buckets) > 1
+               and sum(self._bucket_bytes(b) for b in self._buckets) > self.bucket_budget_bytes):
+            evicted, _ = self._buckets.popitem(last=False)
+            self._evictions += 1
+            print(f"Evicted {evicted} bucket model to stay under memory budget")
+        return model
+
+    def bucket_model(self, bucket):
+        """Return ``(model, bucket_used)``, falling back when a bucket is missing or fails its checks."""
+        for candidate in [bucket] + BUCKET_FALLBACKS.get(bucket, []):
+            try:
+                return self.get(candidate), candidate
+            except MissingArtifactError:
+                continue
+            except ArtifactIntegrityError as e:
+                # e.g. a booster trained against encoders that have since been re-fitted
+                print(f"Skipping {candidate} bucket model: {e}")
+                continue
+        raise MissingArtifactError(f"No cost model available for bucket '{bucket}' or its fallbacks")
+
+    def resolve_encoder_name(self):
+        """Name of the encoder embeddings must come from: the package's, if there is one."""
+        package = self._package()
+        if package is not None and package.encoder_name:
+            # Embeddings must come from the encoder the boosters were trained with
+            self.encoder_name = package.encoder_name
+        return self.encoder_name
+
+    def encoder(self):
+        """Shared SentenceTransformer instance used for all description embeddings."""
+        self.resolve_encoder_name()
+
+        def load_encoder():
+            from sentence_transformers import SentenceTransformer
+            return SentenceTransformer(self.encoder_name)
+
+        with self._lock:
+            if "encoder" not in self._artifacts:
+                self._artifacts["encoder"] = self._load("encoder", load_encoder)
+            return self._artifacts["encoder"]
+
+    def stats(self):
+        """Per-artifact load time and memory figures, plus process totals."""
+        with self._lock:
+            per_artifact = {name: dict(s) for name, s in self._stats.items()}
+            resident_buckets = list(self._buckets)
+            evictions = self._evictions
+        return {
+            "artifacts": per_artifact,
+            "resident_buckets": resident_buckets,
+            "bucket_evictions": evictions,
+            "total_load_seconds": round(sum(s["load_seconds"] for s in per_artifact.values()), 4),
+            "process_rss_bytes": _rss_bytes(),
+        }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Process-wide ModelRegistry shared by every Streamlit session."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
+
+
+def load_models():
+    registry = get_registry()
+    return (
+        registry.bucket_model("low")[0],
+        registry.bucket_model("mid")[0],
+        registry.bucket_model("high")[0],
+        registry.get("duration"),
+        registry.get("ohe"),
+        registry.get("ohe_duration"),
+        registry.get("scaler"),
+    )
@@ -0,0 +1,261 @@
+"""Schema, repair and typed coercion for the LLM's plan and phase-duration JSON.
+
+Both requests ask for JSON mode (``JSON_MODE``), but the reply can still be
+fenced, have trailing commas, be cut off mid-array or carry numbers as unit
+strings ("12 weeks", "$1.2M"). ``repair_json`` fixes what it can locally and
+``coerce_plan`` / ``coerce_durations`` turn the result into the shapes the app
+renders, so a bad reply rarely means paying for another generation.
+"""
+import json
+import math
+import re
+
+PHASES_KEY = "ConstructionPhases"
+RESOURCES_KEY = "Resources & Materials"
+JSON_MODE = {"type": "json_object"}
+
+
+class PlanSchemaError(ValueError):
+    """Raised when a reply has nothing usable even after repair."""
+
+
+_CLOSERS = {"{": "}", "[": "]"}
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+
+
+def _strip_fences(text):
+    text = text.strip()
+    fenced = re.search(r"```(?:json)?\s*(.*?)(?:```|$)", text, re.DOTALL)
+    return fenced.group(1) if fenced else text
+
+
+def _remove_trailing_commas(text):
+    # Only outside strings: split on string literals and fix the code between them
+    parts = re.split(r'("(?:[^"\\]|\\.)*")', text)
+    return "".join(p if i % 2 else _TRAILING_COMMA.sub(r"\1", p) for i, p in enumerate(parts))
+
+
+def repair_json(text):
+    """Parse ``text`` as JSON, repairing fences, trailing commas and truncation.
+
+    Takes the first top-level ``{...}``/``[...]`` (ignoring prose around it).
+    If it never closes, the text is cut back to the last complete value and
+    the open containers are closed. Raises PlanSchemaError if nothing parses.
+    """
+    text = _strip_fences(text or "")
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        raise PlanSchemaError("no JSON object in the response")
+
+    stack = []
+    cuts = []  # (end index, open containers) where the text can be cut and closed
+    in_string = escape = False
+    end = None
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in "{[":
+            stack.append(c)
+            cuts.append((i + 1, tuple(stack)))
+        elif c in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                end = i + 1
+                break
+        elif c == ",":
+            cuts.append((i, tuple(stack)))
+
+    if end is not None:
+        candidates = [text[start:end]]
+    else:
+        # Truncated: close everything at the end of the text, else at earlier cut points
+        tail = text[start:].rstrip()
+        if in_string:
+            tail += '"'
+        candidates = [tail + "".join(_CLOSERS[s] for s in reversed(stack))]
+        candidates += [text[start:pos] + "".join(_CLOSERS[s] for s in reversed(open_))
+                       for pos, open_ in reversed(cuts)]
+    for candidate in candidates:
+        for attempt in (candidate, _remove_trailing_commas(candidate)):
+            try:
+                return json.loads(attempt)
+            except ValueError:
+                continue
+    raise PlanSchemaError("the response JSON could not be repaired")
+
+
+_RANGE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:-|–|to)\s*(\d+(?:\.\d+)?)")
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_MULTIPLIERS = [(re.compile(r"\d\s*(?:b|bn|billion)\b"), 1e9),
+                (re.compile(r"\d\s*(?:m|mm|mn|million)\b"), 1e6),
+                (re.compile(r"\d\s*(?:k|thousand)\b"), 1e3)]
+
+
+def to_number(value, default=0.0):
+    """Float from numbers or strings like "$1,200,000", "1.2M", "8-10" (midpoint)."""
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return float(value) if math.isfinite(value) else default
+    if not isinstance(value, str):
+        return default
+    text = value.lower().replace(",", "").replace("$", "")
+    span = _RANGE.search(text)
+    if span:
+        number = (float(span.group(1)) + float(span.group(2))) / 2
+    else:
+        found = _NUMBER.search(text)
+        if not found:
+            return default
+        number = float(found.group(0))
+    for pattern, factor in _MULTIPLIERS:
+        if pattern.search(text):
+            return number * factor
+    return number
+
+
+def to_weeks(value, default=0.0):
+    """Duration in weeks from a number (already weeks) or "3 months", "1 year", "10 days"."""
+    weeks = to_number(value, default=None)
+    if weeks is None:
+        return default
+    if isinstance(value, str):
+        unit = value.lower()
+        if re.search(r"\bdays?\b", unit):
+            weeks /= 7
+        elif re.search(r"\bmonths?\b", unit):
+            weeks *= 4.345
+        elif re.search(r"\b(?:years?|yrs?)\b", unit):
+            weeks *= 52.14
+    return weeks
+
+
+def _first(d, keys, default=None):
+    for key in keys:
+        if key in d and d[key] not in (None, ""):
+            return d[key]
+    return default
+
+
+def _str_list(value):
+    if isinstance(value, str):
+        value = re.split(r"[,;]", value)
+    if not isinstance(value, (list, tuple)):
+        return []
+    return [str(v).strip() for v in value if v not in (None, "") and str(v).strip()]
+
+
+def coerce_subtask(sub):
+    if isinstance(sub, str):
+        sub = {"SubtaskName": sub}
+    if not isinstance(sub, dict):
+        return None
+    name = _first(sub, ("SubtaskName", "Name", "Subtask", "Task"))
+    if name is None:
+        return None
+    return {
+        "SubtaskName": str(name),
+        "Description": str(_first(sub, ("Description",), "")),
+        "CostEstimate": to_number(_first(sub, ("CostEstimate", "Cost (USD)", "Cost", "EstimatedCost"))),
+        "DurationEstimate": to_weeks(_first(sub, ("DurationEstimate", "Duration (weeks)", "Duration"))),
+        "LaborCategories": _str_list(_first(sub, ("LaborCategories", "Labor Category", "Labor"), [])),
+        "Vendors": _str_list(_first(sub, ("Vendors", "Vendor"), [])),
+        "Permissions": _str_list(_first(sub, ("Permissions", "Permission", "Permission if needed"), [])),
+    }
+
+
+def coerce_phase(phase):
+    """Typed phase dict, or None if it has no name (e.g. a half-streamed fragment)."""
+    if not isinstance(phase, dict):
+        return None
+    name = _first(phase, ("PhaseName", "Phase", "Name"))
+    if name is None:
+        return None
+    subtasks = _first(phase, ("Subtasks", "Subphase Breakdown", "Subphases"), [])
+    return {
+        "PhaseName": str(name),
+        "Description": str(_first(phase, ("Description",), "")),
+        "EstimatedCost": to_number(_first(phase, ("EstimatedCost", "Cost (USD)", "Cost"))),
+        "DurationEstimate": to_weeks(_first(phase, ("DurationEstimate", "Duration (weeks)", "Duration"))),
+        "Subtasks": [s for s in map(coerce_subtask, subtasks if isinstance(subtasks, list) else []) if s],
+        "LaborCategories": _str_list(_first(phase, ("LaborCategories", "Labor Category", "Labor"), [])),
+        "Vendors": _str_list(_first(phase, ("Vendors", "Vendor"), [])),
+        "Permissions": _str_list(_first(phase, ("Permissions", "Permission", "Permission if needed"), [])),
+    }
+
+
+def coerce_resources(resources):
+    if isinstance(resources, list):
+        resources = {"Materials": resources}
+    if not isinstance(resources, dict):
+        return {}
+    result = {}
+    for category, items in resources.items():
+        rows = []
+        for item in items if isinstance(items, list) else [items]:
+            if not isinstance(item, dict):
+                continue
+            rows.append({
+                "Item": str(_first(item, ("Item", "Name"), "")),
+                "QuantityEstimate": str(_first(item, ("QuantityEstimate", "Quantity"), "N/A")),
+                "EstimatedCost": to_number(_first(item, ("EstimatedCost", "Cost (USD)", "Cost"))),
+            })
+        if rows:
+            result[str(category)] = rows
+    return result
+
+
+def coerce_plan(obj):
+    """``{"ConstructionPhases": [...], "Resources & Materials": {...}}`` with typed fields."""
+    if isinstance(obj, list):
+        obj = {PHASES_KEY: obj}
+    if not isinstance(obj, dict):
+        raise PlanSchemaError("the plan is not a JSON object")
+    phases = _first(obj, (PHASES_KEY, "Phases", "phases"), [])
+    return {
+        PHASES_KEY: [p for p in map(coerce_phase, phases if isinstance(phases, list) else []) if p],
+        RESOURCES_KEY: coerce_resources(_first(obj, (RESOURCES_KEY, "Resources", "Materials"), {})),
+    }
+
+
+def parse_plan(text):
+    """Repair and coerce a complete plan reply; raises PlanSchemaError if it has no phases."""
+    plan = coerce_plan(repair_json(text))
+    if not plan[PHASES_KEY]:
+        raise PlanSchemaError("the plan has no construction phases")
+    return plan
+
+
+def _phase_key(key):
+    # "II. Design" -> "ii": the roman numeral identifies the phase even if the name drifts
+    numeral = re.match(r"\s*([ivx]+)\b", str(key).lower())
+    return numeral.group(1) if numeral else str(key).strip().lower()
+
+
+def coerce_durations(obj, phase_codes):
+    """``{phase_code: weeks}`` for each code the reply covers, matched exactly or by numeral."""
+    if not isinstance(obj, dict):
+        raise PlanSchemaError("the duration reply is not a JSON object")
+    by_numeral = {_phase_key(k): v for k, v in obj.items()}
+    durations = {}
+    for code in phase_codes:
+        value = obj.get(code, by_numeral.get(_phase_key(code)))
+        weeks = to_weeks(value, default=None)
+        if weeks is not None and weeks > 0:
+            durations[code] = weeks
+    if not durations:
+        raise PlanSchemaError("the duration reply has no usable phase durations")
+    return durations
+
+
+def parse_durations(text, phase_codes):
+    return coerce_durations(repair_json(text), phase_codes)
@@ -0,0 +1,129 @@
+"""Headless HTTP/JSON API around the estimation engine.
+
+    python prediction_service.py --port 8502 --warm high
+
+Endpoints:
+    GET  /health    -> {"status": "ok"}
+    GET  /stats     -> model registry and embedding cache statistics
+    POST /estimate  -> phase cost/duration tables
+
+POST /estimate body:
+    {"bucket": "high",
+     "items": [{"description": "New 5-storey school in Queens",
+                "durations": {"I. Scope": 12, "V. Construction": "80 weeks"}}]}
+
+A single {"description": ..., "durations": ...} object is accepted in place
+of "items". "durations" is optional: supplied weeks are used as given and
+the duration model fills in the other phases. All items in one request are
+scored with a single predict call.
+"""
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from estimation import get_engine
+from model_loading import BUCKET_FALLBACKS
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+def estimate(payload, engine=None):
+    """Run a decoded /estimate payload through the engine and return the JSON response."""
+    bucket = payload.get("bucket", "high")
+    # Checked before the registry: other names would fetch the wrong artifact
+    if not isinstance(bucket, str) or bucket not in BUCKET_FALLBACKS:
+        raise ValueError(f"'bucket' must be one of {', '.join(BUCKET_FALLBACKS)}")
+    engine = engine or get_engine()
+    items = payload.get("items")
+    if items is None:
+        items = [payload]
+    if not isinstance(items, list) or not items:
+        raise ValueError("'items' must be a non-empty list")
+    descriptions = []
+    durations_list = []
+    for item in items:
+        description = item.get("description")
+        if not isinstance(description, str) or not description.strip():
+            raise ValueError("every item needs a non-empty 'description'")
+        descriptions.append(description)
+        durations_list.append(item.get("durations") or {})
+
+    # Caller-supplied durations win; the duration model covers the rest
+    tables, used_bucket = engine.predict_cost_duration_batch(descriptions, bucket, durations_list, llm_weight=1.0)
+    results = []
+    for description, table in zip(descriptions, tables):
+        results.append({
+            "description": description,
+            "phases": table.to_dict(orient="records"),
+            "total_cost": round(float(table["Predicted Cost (USD)"].sum()), 2),
+            "total_duration_weeks": round(float(table["Predicted Duration (weeks)"].sum()), 2),
+        })
+    return {"bucket_requested": bucket, "bucket_used": used_bucket, "results": results}
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    engine = None
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send_json(200, {
+                "models": self.engine.registry.stats(),
+                "embeddings": self.engine.embedder.stats(),
+            })
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/estimate":
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._send_json(413, {"error": "request body too large"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            self._send_json(200, estimate(payload, self.engine))
+        except (ValueError, AttributeError) as e:
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host="127.0.0.1", port=8502, warm=("high",)):
+    engine = get_engine()
+    if warm:
+        print(f"Warming models for buckets: {', '.join(warm)}")
+        engine.warm(warm)
+    PredictionHandler.engine = engine
+    server = ThreadingHTTPServer((host, port), PredictionHandler)
+    print(f"Prediction service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Prediction service stopped.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless Solace estimation API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--warm", nargs="*", default=["high"], choices=list(BUCKET_FALLBACKS),
+                        help="cost buckets to load before accepting requests")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.warm)
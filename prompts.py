@@ -0,0 +1,158 @@
+"""Prompt text and message lists for every Mistral call the app makes.
+
+Messages are plain role/content dicts, which the mistralai client accepts
+alongside its own message classes.
+"""
+import json
+
+MODEL = "mistral-medium"
+
+# Guided questions asked in order; the key is where the answer is stored in collected_info
+QUESTIONS = [
+    ("ProjectDescription", "Please describe the project in a few sentences."),
+    ("Location", "Which part of NYC is the school located in?"),
+    ("Grades", "How many grades will the school have?"),
+    ("StudentsPerClass", "What is the average number of students per class?"),
+    ("Timeline", "What is the expected construction timeline (in months)?"),
+    ("SquareFootage", "What is the square footage of the construction?"),
+    ("SpecialReqs", "Are there any special facilities or requirements needed?"),
+    # ("Floors", "How many floors will the building have?"),
+    # ("DemolitionNeeded", "Is demolition needed?"),
+    # ("Basement", "Is a basement needed?"),
+]
+
+
+def question_system_prompt(collected_info, next_question):
+    if next_question:
+        return f"""
+    You are an expert NYC school construction planner assistant.
+
+    Current collected info:
+    {json.dumps(collected_info, indent=2)}
+
+    Ask only the questions defined (they have been predefined, so you will get the questions, no need to add too much) and wait for user response, do not repeat question. 
+    Do not display unnecessary information or the previous questions asked. Do provide like the average for each value, like average square foot required for a school construction and average class size etc.
+    Do not display json to the user.
+    Also tell the user that they are advised to answer the questions asked and can provide more information for context but they will be asked the guided questions.
+    Next question:
+    {next_question}
+    """
+    return f"""
+    You have collected all the necessary project information:
+    {json.dumps(collected_info, indent=2)}
+    Display in formatted way, not json
+    Inform the user that all info is collected and ask if they want to generate the construction plan.
+    Ask each question only once, do not repeat the previous question, ask only the defined 7 questions.
+    """
+
+
+def clarification_system_prompt(collected_info, question):
+    return f"""
+    You are an expert NYC school construction planner assistant.
+
+    Current collected info:
+    {json.dumps(collected_info, indent=2)}
+
+    The user was asked: {question}
+    Instead of answering, they asked something. Answer their question briefly and concretely (NYC school construction context, typical values where useful).
+    Do not ask the next question and do not display json; the guided question will be repeated after your answer.
+    """
+
+
+def plan_prompt(collected_info):
+    return f"""
+    Using the collected info, generate a detailed construction plan in JSON format with phases, subtasks, vendors, permissions, materials, and labor.
+
+    Output should be a list of 5 phases, depending on the user inputs. Each phase must include:
+    - Phase: (string) e.g. "I. Site Preperation", "II. Foundation", "III. Comissioning", "IV. Purchase & Install", "V. Construction",
+    - Description: (string),a short description,
+    - Subphases/subtaskes: 5-10 sub tasks within the phases
+    - Subphase Breakdown: (list of phases and subtasks(5-10 phases and 5-10 subtasks) from above as dicts). Each dict must have:
+    - Name: (string)
+    - Description(string)
+    - Cost (USD): (number)
+    - Labor Category
+    - Vendor: (list of strings),1–2 **only actual NYC-based vendors or well-known relevant companies, not made up names** (avoid placeholders like 'VendorX', 'VendorA'),
+    - Permission if needed: (list of strings),required NYC government permissions (e.g., SCA, DoE, FDNY),
+    - Duration (weeks): (number)- Please predict realistic numbers based on actual construction timelines and if the user has provided a timeline, try to get the values in that ballpark but if they are unrealistic, then predict normal values,
+    - Resources & Material-Raw materials used in construction
+    - Item-should have the name and describe for which phases and subtask it is needed
+    - Quantity-number followed by correct units e.g-metric tonne, feet etc
+    - Cost (USD): (number), please predict realistic numbers and should not exceed 60% of the total estimated cost(the total of all the resources should be under 12 million)
+    
+
+    Collected info:
+    {json.dumps(collected_info, indent=2)}
+
+    Only output JSON with this structure:
+    {{ 
+    "ConstructionPhases": [
+        {{
+        "PhaseName": "string",
+        "Description": "string",
+        "EstimatedCost": number,
+        "DurationEstimate": number,
+        "Subtasks": [
+            {{
+            "SubtaskName": "string",
+            "Description": "string",
+            "CostEstimate": number,
+            "DurationEstimate": number,
+            "LaborCategories": [],
+            "Vendors": [],
+            "Permissions": []
+            }}
+        ],
+        "LaborCategories": [],
+        "Vendors": [],
+        "Permissions": []
+        }}
+    ],
+    "Resources & Materials": {{
+        "CategoryName": [
+        {{
+            "Item": "string",
+            "QuantityEstimate": "string",
+            "EstimatedCost": number
+        }}
+        ]
+    }}
+    }}
+    No extra explanation.
+    """
+
+
+def plan_messages(collected_info):
+    return [
+        {"role": "system", "content": "You summarize the project info and generate the final JSON plan."},
+        {"role": "user", "content": plan_prompt(collected_info)},
+    ]
+
+
+def duration_prompt(description, phase_mapping):
+    phases_json_str = json.dumps(phase_mapping, indent=2)
+    return f"""
+        Based on the following project description, estimate the expected duration in weeks for each of the following construction phases, answer in numeric, no ranges:
+
+        Phases:
+        {phases_json_str}
+
+        Project Description:
+        {description}
+
+        Reply in this format (JSON):
+        {{
+            "I. Scope": "<duration in weeks>",
+            "II. Design": "<duration in weeks>",
+            "III. Commissioning": "<duration in weeks>",
+            "IV. Purch & Install": "<duration in weeks>",
+            "V. Construction": "<duration in weeks>"
+        }}
+        """
+
+
+def duration_messages(description, phase_mapping):
+    return [
+        {"role": "system", "content": "You are an expert NYC school construction planner."},
+        {"role": "user", "content": duration_prompt(description, phase_mapping)},
+    ]
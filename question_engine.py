@@ -0,0 +1,277 @@
+"""Deterministic guided-question flow.
+
+Answers are validated and normalised locally and the next question is
+rendered from a template with reference figures, so a normal run through the
+seven questions makes no LLM calls. The LLM is only needed when the user
+asks something free-form instead of answering (see ``QuestionEngine.read``).
+
+Reference timelines and budgets come from the "SCA Capacity" (new school)
+projects in the capital projects CSV. The CSV has no square footage or class
+size columns, so those figures are planning constants:
+
+* NYC class size law (2022) caps: K-3 20, 4-8 23, high school 25 students.
+* ~150 gross sq ft per student is a common planning figure for new NYC schools.
+"""
+import re
+import threading
+
+from prompts import QUESTIONS
+
+CLASS_SIZE_CAPS = {"K-3": 20, "4-8": 23, "9-12": 25}
+SQFT_PER_STUDENT = 150
+
+BOROUGHS = {
+    "manhattan": "Manhattan", "harlem": "Manhattan",
+    "brooklyn": "Brooklyn", "bk": "Brooklyn", "kings": "Brooklyn",
+    "queens": "Queens",
+    "bronx": "Bronx", "the bronx": "Bronx", "bx": "Bronx",
+    "staten island": "Staten Island", "si": "Staten Island", "richmond": "Staten Island",
+}
+# "New York" (county) is Manhattan, but only when no borough is named: "Queens, New York" is Queens
+CITY_ALIASES = {"new york": "Manhattan", "ny": "Manhattan"}
+# Questions whose normalizer accepts almost any text
+FREE_TEXT_KEYS = {"ProjectDescription", "SpecialReqs"}
+# First letter of the CSV's building identifier
+BOROUGH_CODES = {"M": "Manhattan", "K": "Brooklyn", "Q": "Queens", "X": "Bronx", "R": "Staten Island"}
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8,
+    "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "half": 0.5,
+}
+
+# Openers that make a reply a question even without a "?"; bare "do"/"is"/"can" aren't
+# enough ("Do not know", "Is fine as is")
+QUESTION_OPENER = re.compile(
+    r"^(?:what|why|which|explain|"
+    r"how (?:do|does|is|are|should|can|much|many|long|would)|"
+    r"(?:can|could|would|should) (?:you|i|we))\b")
+
+
+class Answer:
+    """Result of validating one reply: ``value`` when ok, else a ``message`` to show."""
+
+    def __init__(self, value=None, message=None):
+        self.value = value
+        self.message = message
+
+    @property
+    def ok(self):
+        return self.message is None
+
+
+def _numbers(text):
+    text = re.sub(r"\s+and a half\b", ".5", text.lower().replace(",", ""))
+    for word, value in NUMBER_WORDS.items():
+        text = re.sub(rf"\b{word}\b", str(value), text)
+    return text, [float(n) for n in re.findall(r"\d+(?:\.\d+)?", text)]
+
+
+def _in_range(value, low, high, unit):
+    if value is None or not low <= value <= high:
+        return Answer(message=f"Please enter a number of {unit} between {low:,} and {high:,}.")
+    return Answer(int(round(value)))
+
+
+def normalize_description(text):
+    text = " ".join(text.split())
+    if len(text.split()) < 3:
+        return Answer(message="Please describe the project in at least a few words (e.g. type of school, size, any special scope).")
+    return Answer(text)
+
+
+def normalize_location(text):
+    key = " ".join(re.sub(r"[^a-z ]", " ", text.lower()).split())
+    for aliases in (BOROUGHS, CITY_ALIASES):
+        for alias in sorted(aliases, key=len, reverse=True):
+            if re.search(rf"\b{alias}\b", key):
+                return Answer(aliases[alias])
+    return Answer(message="Please name the borough: Manhattan, Brooklyn, Queens, the Bronx or Staten Island.")
+
+
+def normalize_grades(text):
+    lowered, numbers = _numbers(text)
+    # Grade spans like "K-5", "6 to 8", "9-12": count the grades in the span
+    span = re.search(r"\b(k|pre-?k|\d+)\s*(?:-|to|through|–)\s*(\d+)\b", lowered)
+    if span:
+        start = 0 if span.group(1).startswith(("k", "pre")) else int(span.group(1))
+        return _in_range(int(span.group(2)) - start + 1, 1, 13, "grades")
+    return _in_range(numbers[0] if numbers else None, 1, 13, "grades")
+
+
+def normalize_class_size(text):
+    _, numbers = _numbers(text)
+    return _in_range(numbers[0] if numbers else None, 5, 40, "students")
+
+
+def normalize_timeline(text):
+    lowered, numbers = _numbers(text)
+    if not numbers:
+        return _in_range(None, 1, 120, "months")
+    value = numbers[0]
+    if re.search(r"\by(ea)?rs?\b", lowered):
+        value *= 12
+    elif re.search(r"\bw(ee)?ks?\b", lowered):
+        value /= 4.345
+    return _in_range(value, 1, 120, "months")
+
+
+def normalize_square_footage(text):
+    lowered, numbers = _numbers(text)
+    if not numbers:
+        return _in_range(None, 1000, 1000000, "square feet")
+    value = numbers[0]
+    if re.search(r"\d\s*k\b", lowered):
+        value *= 1000
+    elif re.search(r"\d\s*(m|million)\b", lowered):
+        value *= 1000000
+    return _in_range(value, 1000, 1000000, "square feet")
+
+
+def normalize_special_reqs(text):
+    text = " ".join(text.split())
+    if text.lower().strip(".! ") in {"no", "none", "n/a", "na", "nothing", "no special requirements"}:
+        return Answer("None")
+    return Answer(text) if text else Answer(message="Please list any special facilities, or answer 'none'.")
+
+
+NORMALIZERS = {
+    "ProjectDescription": normalize_description,
+    "Location": normalize_location,
+    "Grades": normalize_grades,
+    "StudentsPerClass": normalize_class_size,
+    "Timeline": normalize_timeline,
+    "SquareFootage": normalize_square_footage,
+    "SpecialReqs": normalize_special_reqs,
+}
+
+
+def is_clarification(text):
+    """True when the user asked something instead of answering."""
+    stripped = " ".join(text.strip().lower().split())
+    return stripped.endswith("?") or bool(QUESTION_OPENER.match(stripped))
+
+
+def reference_stats(csv_path=None):
+    """Median timelines and budgets of new-school ("SCA Capacity") projects in the CSV."""
+    from feature_store import load_feature_table
+
+    try:
+        # Only dates, spend and identifiers are needed: no description cleaning (or nltk)
+        df = load_feature_table(csv_path, clean_text=False)
+    except FileNotFoundError:
+        return {}
+    df = df[df["Project Type"] == "SCA Capacity"].copy()
+    if df.empty:
+        return {}
+    df["start"], df["end"] = df["phase_start_date"], df["phase_end_date"]
+    df["budget"] = df["budgeted_spend"]
+    df["weeks"] = (df["end"] - df["start"]).dt.days / 7
+    projects = df.groupby(["Project Building Identifier", "Project Description"]).agg(
+        start=("start", "min"), end=("end", "max"), budget=("budget", "sum"))
+    months = ((projects["end"] - projects["start"]).dt.days / 30.44).dropna()
+    months = months[months > 0]
+    boroughs = df["Project Building Identifier"].str[0].map(BOROUGH_CODES).dropna()
+    return {
+        "projects": int(len(projects)),
+        "timeline_months_median": round(float(months.median()), 1) if len(months) else None,
+        "timeline_months_p25": round(float(months.quantile(0.25)), 1) if len(months) else None,
+        "timeline_months_p75": round(float(months.quantile(0.75)), 1) if len(months) else None,
+        "budget_median": float(projects["budget"][projects["budget"] > 0].median()),
+        "phase_weeks_median": {
+            phase.strip(): round(float(w), 1)
+            for phase, w in df[df["weeks"] > 0].groupby("Project Phase Name")["weeks"].median().items()
+        },
+        "borough_counts": {b: int(n) for b, n in boroughs.value_counts().items()},
+    }
+
+
+_stats = None
+_stats_lock = threading.Lock()
+
+
+def get_reference_stats():
+    """Process-wide reference stats, computed from the CSV once."""
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = reference_stats()
+        return _stats
+
+
+class QuestionEngine:
+    """Walks QUESTIONS in order, validating answers and rendering the next prompt locally."""
+
+    def __init__(self, questions=QUESTIONS, stats=None):
+        self.questions = questions
+        self.stats = get_reference_stats() if stats is None else stats
+
+    def next_question(self, collected_info):
+        for key, question in self.questions:
+            if collected_info.get(key) in [None, ""]:
+                return key, question
+        return None, None
+
+    def answer(self, key, text):
+        normalizer = NORMALIZERS.get(key)
+        return normalizer(text) if normalizer else Answer(text.strip())
+
+    def read(self, key, text):
+        """``(answer, is_clarification)`` for a reply to the question ``key``.
+
+        A reply the normalizer accepts is an answer even if it ends in "?"
+        ("Manhattan?", "3?"); only rejected replies are checked for a question.
+        Free-text questions accept nearly anything, so there the check comes first.
+        """
+        if key in FREE_TEXT_KEYS and is_clarification(text):
+            return None, True
+        answer = self.answer(key, text)
+        return answer, not answer.ok and is_clarification(text)
+
+    def _hint(self, key, collected_info):
+        stats = self.stats
+        if key == "Location" and stats.get("borough_counts"):
+            counts = ", ".join(f"{b} {n}" for b, n in stats["borough_counts"].items())
+            return f"New-school project phases on record by borough: {counts}."
+        if key == "Grades":
+            return "Typical NYC layouts: elementary K-5 (6 grades), middle 6-8 (3), high school 9-12 (4)."
+        if key == "StudentsPerClass":
+            caps = ", ".join(f"grades {g}: {n}" for g, n in CLASS_SIZE_CAPS.items())
+            return f"NYC class size caps are {caps} students."
+        if key == "Timeline" and stats.get("timeline_months_median"):
+            return (f"Across {stats['projects']} recorded new-school projects the median schedule is "
+                    f"{stats['timeline_months_median']:.0f} months "
+                    f"(middle half {stats['timeline_months_p25']:.0f}-{stats['timeline_months_p75']:.0f}).")
+        if key == "SquareFootage":
+            grades, per_class = collected_info.get("Grades"), collected_info.get("StudentsPerClass")
+            hint = f"Planning figure: about {SQFT_PER_STUDENT} sq ft per student."
+            if isinstance(grades, int) and isinstance(per_class, int):
+                # Assume three sections per grade for a rough seat count
+                seats = grades * per_class * 3
+                hint += f" {grades} grades × 3 classes × {per_class} students ≈ {seats * SQFT_PER_STUDENT:,} sq ft."
+            return hint
+        if key == "SpecialReqs":
+            return "For example: gymnasium, auditorium, science labs, rooftop playground, accessibility upgrades. Answer 'none' if there are none."
+        return ""
+
+    def render_question(self, key, question, collected_info):
+        hint = self._hint(key, collected_info)
+        return f"**{question}**" + (f"\n\n_{hint}_" if hint else "")
+
+    def render_summary(self, collected_info):
+        labels = {"ProjectDescription": "Project", "StudentsPerClass": "Students per class",
+                  "Timeline": "Timeline (months)", "SquareFootage": "Square footage",
+                  "SpecialReqs": "Special requirements"}
+        lines = []
+        for key, _ in self.questions:
+            value = collected_info.get(key)
+            if isinstance(value, int) and key == "SquareFootage":
+                value = f"{value:,}"
+            lines.append(f"- **{labels.get(key, key)}:** {value}")
+        return ("All the project information is collected:\n\n" + "\n".join(lines)
+                + "\n\nClick **Generate Project Plan** below to create the construction plan.")
+
+    def reply(self, collected_info, intro=""):
+        """Markdown for the next assistant turn: the next question, or the summary when done."""
+        key, question = self.next_question(collected_info)
+        body = self.render_question(key, question, collected_info) if key else self.render_summary(collected_info)
+        return key, (intro + "\n\n" + body if intro else body)
@@ -0,0 +1,164 @@
+"""Bulk cost/duration scoring for CSV files.
+
+    python score_csv.py "data/Capital_Project_Schedules_and_Budgets (1).csv" scored.csv
+    python score_csv.py plan.csv scored.parquet --all-phases --bucket mid --workers 4
+
+Each input row is scored with the duration model and then the cost model for
+its phase (``--phase-col``), or for all five app phases with ``--all-phases``.
+Input is streamed in chunks, (description, phase) pairs are deduplicated
+before encoding, chunks fan out to a process pool whose workers keep the
+models loaded, and results are appended to the output as chunks finish.
+"""
+import argparse
+import os
+import resource
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from estimation import PHASE_MAPPING, get_engine
+
+DURATION_COL = "Predicted Duration (weeks)"
+COST_COL = "Predicted Cost (USD)"
+
+
+def _init_worker(bucket):
+    # Load everything once per worker process, not once per chunk
+    get_engine().warm([bucket])
+
+
+def score_rows(descriptions, phases, bucket):
+    """Score parallel description/phase lists; returns (weeks, costs, bucket_used)."""
+    engine = get_engine()
+    pairs = list(dict.fromkeys(zip(descriptions, phases)))
+    u_desc = [d for d, _ in pairs]
+    u_phase = [p for _, p in pairs]
+    weeks = engine.predict_durations_batch(u_desc, u_phase)
+    costs, used_bucket = engine.predict_costs(u_desc, u_phase, weeks, bucket)
+    lookup = {pair: (round(w, 2), round(c, 2)) for pair, w, c in zip(pairs, weeks, costs)}
+    scored = [lookup[pair] for pair in zip(descriptions, phases)]
+    return [w for w, _ in scored], [c for _, c in scored], used_bucket
+
+
+def _score_chunk(index, descriptions, phases, bucket):
+    weeks, costs, used_bucket = score_rows(descriptions, phases, bucket)
+    return index, weeks, costs, used_bucket
+
+
+class _OutputWriter:
+    """Appends DataFrames to a CSV or Parquet file as they are produced."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self._writer = None
+        self._wrote_header = False
+
+    def write(self, df):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            df.to_csv(self.path, mode="a" if self._wrote_header else "w",
+                      header=not self._wrote_header, index=False)
+            self._wrote_header = True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    unit = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit
+    return own / 1e6, children / 1e6
+
+
+def _prepare_chunk(chunk, args):
+    chunk = chunk.copy()
+    chunk[args.description_col] = chunk[args.description_col].fillna("").astype(str)
+    if args.all_phases:
+        chunk = chunk.merge(pd.DataFrame({"Phase Code": list(PHASE_MAPPING)}), how="cross")
+        phase_col = "Phase Code"
+    else:
+        phase_col = args.phase_col
+        chunk[phase_col] = chunk[phase_col].fillna("Unknown").astype(str)
+    return chunk, chunk[args.description_col].tolist(), chunk[phase_col].tolist()
+
+
+def run(args):
+    reader = pd.read_csv(args.input, chunksize=args.chunksize)
+    writer = _OutputWriter(args.output)
+    start = time.perf_counter()
+    n_rows = 0
+    buckets_used = set()
+    pending = {}
+    ready = {}
+    next_to_write = 0
+
+    def collect(done):
+        nonlocal next_to_write, n_rows
+        for future in done:
+            index, weeks, costs, used_bucket = future.result()
+            chunk = pending.pop(future)
+            chunk[DURATION_COL] = weeks
+            chunk[COST_COL] = costs
+            ready[index] = chunk
+            buckets_used.add(used_bucket)
+        # Keep output in input order
+        while next_to_write in ready:
+            out = ready.pop(next_to_write)
+            writer.write(out)
+            n_rows += len(out)
+            next_to_write += 1
+            elapsed = time.perf_counter() - start
+            print(f"  {n_rows:,} rows scored ({n_rows / elapsed:,.0f} rows/s)", flush=True)
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(args.bucket,)) as pool:
+        for index, raw in enumerate(reader):
+            chunk, descriptions, phases = _prepare_chunk(raw, args)
+            future = pool.submit(_score_chunk, index, descriptions, phases, args.bucket)
+            pending[future] = chunk
+            # Bound the number of chunks held in memory
+            if len(pending) >= 2 * args.workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+    writer.close()
+
+    elapsed = time.perf_counter() - start
+    own_mb, children_mb = _peak_rss_mb()
+    print(f"✅ Scored {n_rows:,} rows in {elapsed:.1f}s ({n_rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    print(f"   Cost model bucket(s) used: {', '.join(sorted(buckets_used)) or 'none'}")
+    print(f"   Peak RSS: {own_mb:,.0f} MB main process, {children_mb:,.0f} MB largest worker")
+    print(f"   Output written to {args.output}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk cost/duration scoring for CSV files")
+    parser.add_argument("input")
+    parser.add_argument("output", help="output path ending in .csv or .parquet")
+    parser.add_argument("--description-col", default="Project Description")
+    parser.add_argument("--phase-col", default="Project Phase Name")
+    parser.add_argument("--all-phases", action="store_true",
+                        help="score every app phase for each row instead of --phase-col")
+    parser.add_argument("--bucket", default="high", choices=["low", "mid", "high"])
+    parser.add_argument("--chunksize", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    args = parser.parse_args(argv)
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
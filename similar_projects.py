@@ -0,0 +1,225 @@
+"""Nearest historical projects for a description.
+
+Every distinct ``Project Description`` in the capital projects CSV is embedded
+once with the app's sentence encoder, L2-normalised and stored as a float32
+``.npy`` matrix that is opened with ``mmap_mode="r"``. A query is one BLAS
+matrix-vector product over that matrix plus ``np.argpartition`` for the top
+k, with no Python-level loop over rows (``python similar_projects.py`` prints
+the query time).
+
+When the CSV changes, only descriptions that weren't in the previous index
+are encoded; existing vectors are copied over from the old matrix. Layout of
+``cache/similar_projects/``::
+
+    meta.json       csv sha256, encoder name, dimension, row count (written last)
+    vectors.npy     (n, dim) normalised float32 embeddings
+    hashes.txt      text hash of the description in each row
+    projects.pkl    per-phase history rows (school, phase, weeks, budget, spend)
+"""
+import json
+import os
+import threading
+
+import numpy as np
+
+from artifacts import atomic_write, write_text
+from embedding_cache import normalize_text, text_hash
+from feature_store import file_sha256, load_feature_table, resolve_data_path
+from question_engine import BOROUGH_CODES
+
+INDEX_DIR = os.environ.get("SOLACE_SIMILAR_INDEX_DIR", os.path.join("cache", "similar_projects"))
+BUILD_BATCH = 512
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def load_history(csv_path=None):
+    """One row per project phase with the fields shown for similar projects."""
+    import pandas as pd
+
+    df = load_feature_table(csv_path, clean_text=False)
+    description = df["Project Description"].fillna("").map(normalize_text)
+    history = pd.DataFrame({
+        "description": description,
+        "hash": description.map(text_hash),
+        "school": df["Project School Name"],
+        "borough": df["Project Building Identifier"].str[:1].map(BOROUGH_CODES),
+        "project_type": df["Project Type"],
+        "phase": df["Project Phase Name"].str.strip(),
+        "status": df["project_status"],
+        "weeks": ((df["phase_end_date"] - df["phase_start_date"]).dt.days / 7).round(1),
+        "budget": df["budgeted_spend"],
+        "spend": df["actual_spend"],
+    })
+    return history[history["description"] != ""].reset_index(drop=True)
+
+
+class SimilarProjectsIndex:
+    """Memory-mapped cosine-similarity index over the distinct CSV descriptions."""
+
+    def __init__(self, embedder, encoder_factory=None, encoder_name=None,
+                 index_dir=INDEX_DIR, csv_path=None):
+        self.embedder = embedder
+        self._encoder_factory = encoder_factory
+        self.encoder_name = encoder_name or getattr(embedder, "encoder_name", "")
+        self.index_dir = index_dir
+        self.csv_path = csv_path
+        self._lock = threading.Lock()
+        self.vectors = None
+        self.hashes = []
+        self.history = None
+        self._groups = None
+        self.build_stats = {}
+
+    def _path(self, name):
+        return os.path.join(self.index_dir, name)
+
+    def _meta(self):
+        try:
+            with open(self._path("meta.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load(self):
+        """Open the index, rebuilding it first if the CSV or encoder changed."""
+        import pandas as pd
+
+        with self._lock:
+            self.csv_path = resolve_data_path(self.csv_path)
+            csv_hash = file_sha256(self.csv_path)
+            meta = self._meta()
+            if meta.get("csv_sha256") != csv_hash or meta.get("encoder_name") != self.encoder_name:
+                self._build(csv_hash, meta)
+            self.vectors = np.load(self._path("vectors.npy"), mmap_mode="r")
+            with open(self._path("hashes.txt"), encoding="ascii") as f:
+                self.hashes = f.read().split()
+            self.history = pd.read_pickle(self._path("projects.pkl"))
+            self._groups = self.history.groupby("hash").indices
+            return self
+
+    def _build(self, csv_hash, old_meta):
+        os.makedirs(self.index_dir, exist_ok=True)
+        history = load_history(self.csv_path)
+        distinct = history.drop_duplicates("hash")[["hash", "description"]]
+
+        # Reuse vectors for descriptions the previous index already embedded
+        old_rows = {}
+        old_vectors = None
+        if old_meta.get("encoder_name") == self.encoder_name and os.path.exists(self._path("vectors.npy")):
+            old_vectors = np.load(self._path("vectors.npy"), mmap_mode="r")
+            with open(self._path("hashes.txt"), encoding="ascii") as f:
+                old_rows = {h: i for i, h in enumerate(f.read().split())}
+        new = distinct[~distinct["hash"].isin(old_rows)]
+
+        encoded = {}
+        if len(new):
+            encoder = self._encoder_factory() if self._encoder_factory else self.embedder
+            texts = new["description"].tolist()
+            for start in range(0, len(texts), BUILD_BATCH):
+                batch = np.asarray(encoder.encode(texts[start:start + BUILD_BATCH]), dtype=np.float32)
+                for h, vector in zip(new["hash"].iloc[start:start + BUILD_BATCH], _normalize_rows(batch)):
+                    encoded[h] = vector
+        dim = next(iter(encoded.values())).shape[0] if encoded else old_vectors.shape[1]
+
+        hashes = distinct["hash"].tolist()
+
+        def write_vectors(tmp):
+            out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(len(hashes), dim))
+            for i, h in enumerate(hashes):
+                out[i] = encoded[h] if h in encoded else old_vectors[old_rows[h]]
+            out.flush()
+            del out
+
+        atomic_write(self._path("vectors.npy"), write_vectors)
+        atomic_write(self._path("hashes.txt"), lambda tmp: write_text(tmp, "\n".join(hashes) + "\n"))
+        atomic_write(self._path("projects.pkl"), lambda tmp: history.to_pickle(tmp))
+        self.build_stats = {"rows": len(hashes), "encoded": len(encoded), "reused": len(hashes) - len(encoded)}
+        meta = {"csv_sha256": csv_hash, "encoder_name": self.encoder_name, "dim": dim, **self.build_stats}
+        # Meta goes last: a reader never pairs it with half-written files
+        atomic_write(self._path("meta.json"), lambda tmp: write_text(tmp, json.dumps(meta, indent=2)))
+
+    def search(self, description, k=5):
+        """Top ``k`` distinct past descriptions as ``[(score, description_hash)]``, best first."""
+        if self.vectors is None:
+            self.load()
+        query = np.asarray(self.embedder.encode([description]), dtype=np.float32)
+        query = _normalize_rows(query)[0]
+        scores = self.vectors @ query
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.hashes[i]) for i in top]
+
+    def similar_projects(self, description, k=5):
+        """Historical phase rows for the ``k`` nearest descriptions, with a ``similarity`` column."""
+        import pandas as pd
+
+        frames = []
+        for score, h in self.search(description, k):
+            rows = self.history.iloc[self._groups[h]].copy()
+            rows.insert(0, "similarity", round(score, 3))
+            frames.append(rows)
+        return pd.concat(frames, ignore_index=True) if frames else self.history.iloc[0:0]
+
+
+def phase_reference(similar):
+    """Similarity-weighted per-phase duration and spend of similar projects (a sanity check for estimates)."""
+    import pandas as pd
+
+    done = similar[(similar["weeks"] > 0) & similar["spend"].notna()]
+    if done.empty:
+        return pd.DataFrame(columns=["phase", "weeks", "spend", "projects"])
+    weighted = done.assign(w=done["similarity"].clip(lower=0))
+    weighted = weighted.assign(w_weeks=weighted["w"] * weighted["weeks"], w_spend=weighted["w"] * weighted["spend"])
+    grouped = weighted.groupby("phase")[["w", "w_weeks", "w_spend"]].sum()
+    grouped = grouped[grouped["w"] > 0]
+    return grouped.assign(
+        weeks=(grouped["w_weeks"] / grouped["w"]).round(1),
+        spend=(grouped["w_spend"] / grouped["w"]).round(0),
+        projects=done.groupby("phase").size(),
+    )[["weeks", "spend", "projects"]].reset_index()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_similar_projects():
+    """Process-wide index, loaded (and rebuilt if stale) on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            from embedding_cache import get_embedding_cache
+            from model_loading import get_registry
+
+            registry = get_registry()
+            _index = SimilarProjectsIndex(get_embedding_cache(), registry.encoder,
+                                          registry.resolve_encoder_name()).load()
+        return _index
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build the similar-projects index and run a query")
+    parser.add_argument("query", nargs="?", default="New elementary school")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = get_similar_projects()
+    print(f"Index ready in {time.perf_counter() - start:.1f}s: {index.vectors.shape[0]} descriptions "
+          f"{index.build_stats or '(up to date)'}")
+    index.search(args.query, args.k)  # encode once so the timing below is the search itself
+    start = time.perf_counter()
+    hits = index.search(args.query, args.k)
+    print(f"Top {args.k} in {(time.perf_counter() - start) * 1e3:.2f} ms (query embedding cached):")
+    for score, h in hits:
+        print(f"  {score:.3f}  {index.history.iloc[index._groups[h][0]]['description']}")
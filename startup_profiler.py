@@ -0,0 +1,80 @@
+"""Report cold import and artifact load times for the app's startup path.
+
+Run standalone with ``python startup_profiler.py`` or inside the app with
+``streamlit run app.py -- --profile-startup``.
+"""
+import os
+import subprocess
+import sys
+import time
+
+FLAG = "--profile-startup"
+
+# Everything app.py may import, roughly in the order a full session needs it
+PROFILED_MODULES = [
+    "streamlit",
+    "numpy",
+    "pandas",
+    "sklearn",
+    "xgboost",
+    "requests",
+    "mistralai",
+    "plotly.express",
+    "torch",
+    "sentence_transformers",
+]
+
+
+def enabled(argv=None):
+    return FLAG in (sys.argv if argv is None else argv)
+
+
+def import_time(module):
+    """Cold cumulative import time in seconds, measured in a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if proc.returncode != 0:
+        return None
+    for line in reversed(proc.stderr.splitlines()):
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1e6
+    return None
+
+
+def artifact_times():
+    """Load every artifact into a private registry and report its load stats."""
+    from model_loading import ARTIFACTS, ModelRegistry, MissingArtifactError
+
+    registry = ModelRegistry()
+    for name in ARTIFACTS:
+        try:
+            registry.get(name)
+        except MissingArtifactError:
+            continue
+    registry.encoder()
+    return registry.stats()["artifacts"]
+
+
+def profile_startup():
+    """Return a list of (kind, name, seconds) rows; seconds is None if unavailable."""
+    rows = [("import", m, import_time(m)) for m in PROFILED_MODULES]
+    for name, s in artifact_times().items():
+        rows.append(("artifact", name, s["load_seconds"]))
+    return rows
+
+
+def format_report(rows):
+    lines = [f"{'kind':<10}{'name':<24}{'seconds':>10}"]
+    for kind, name, seconds in rows:
+        value = f"{seconds:.3f}" if seconds is not None else "n/a"
+        lines.append(f"{kind:<10}{name:<24}{value:>10}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    print(format_report(profile_startup()))
+    print(f"\nProfiled in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,135 @@
+import json
+
+from plan_schema import PHASES_KEY, RESOURCES_KEY, PlanSchemaError, coerce_phase, coerce_plan, parse_plan
+
+
+class _Frame:
+    __slots__ = ("kind", "key", "start", "current_key")
+
+    def __init__(self, kind, key, start):
+        self.kind = kind  # "{" or "["
+        self.key = key  # key this container is the value of, if any
+        self.start = start
+        self.current_key = None
+
+
+class PlanStreamParser:
+    """Incrementally parses the streamed project plan JSON.
+
+    Text is fed in arbitrary chunks as the LLM produces it. Each time a phase
+    object inside the top-level "ConstructionPhases" array closes, it is
+    decoded, coerced to the plan schema and returned from ``feed``, so the UI
+    can render phases while the rest of the plan is still being generated.
+    ``finish`` returns the whole typed plan. If the response was cut off or
+    malformed, it is repaired locally; failing that, the partial plan built
+    from every phase (and the resources block) that did complete is returned.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.phases = []
+        self.resources = None
+        self.truncated = False
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_string = None
+        self._done = False
+
+    def feed(self, chunk):
+        """Add text; returns the list of phase dicts completed by this chunk."""
+        self.buffer += chunk
+        completed = []
+        buf = self.buffer
+        i = self._pos
+        while i < len(buf) and not self._done:
+            c = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._last_string = buf[self._string_start + 1:i]
+            elif c == '"' and self._stack:
+                self._in_string = True
+                self._string_start = i
+            elif c == ":" and self._stack and self._stack[-1].kind == "{":
+                try:
+                    self._stack[-1].current_key = json.loads(f'"{self._last_string}"')
+                except ValueError:
+                    self._stack[-1].current_key = self._last_string
+            elif c == "{" or (c == "[" and self._stack):
+                parent = self._stack[-1] if self._stack else None
+                key = parent.current_key if parent is not None and parent.kind == "{" else None
+                self._stack.append(_Frame(c, key, i))
+            elif c in "}]" and self._stack:
+                frame = self._stack.pop()
+                completed.extend(self._on_close(frame, i))
+                if not self._stack:
+                    self._done = True
+            i += 1
+        self._pos = i
+        return completed
+
+    def _on_close(self, frame, end):
+        depth = len(self._stack)
+        parent = self._stack[-1] if self._stack else None
+        # {"ConstructionPhases": [ <phase> ... ]}: root object, phases array, phase
+        if (frame.kind == "{" and depth == 2 and parent.kind == "["
+                and parent.key == PHASES_KEY):
+            phase = coerce_phase(self._decode(frame.start, end))
+            if phase is not None:
+                self.phases.append(phase)
+                return [phase]
+        elif depth == 1 and frame.key == RESOURCES_KEY:
+            resources = self._decode(frame.start, end)
+            if resources is not None:
+                self.resources = resources
+        return []
+
+    def _decode(self, start, end):
+        try:
+            return json.loads(self.buffer[start:end + 1])
+        except ValueError:
+            return None
+
+    def partial_plan(self):
+        return coerce_plan({PHASES_KEY: list(self.phases), RESOURCES_KEY: self.resources or {}})
+
+    def finish(self):
+        """Typed full plan; repaired, or partial if repair fails, when it doesn't parse as is.
+
+        ``truncated`` is set only when the text stopped inside the JSON (an
+        unterminated string or container), not for complete replies that just
+        needed repair (prose around the JSON, trailing commas).
+        """
+        self.truncated = bool(self._stack)
+        text = self.buffer.strip().removeprefix("```json").removesuffix("```").strip()
+        try:
+            return coerce_plan(json.loads(text))
+        except ValueError:
+            pass
+        partial = self.partial_plan()
+        try:
+            repaired = parse_plan(self.buffer)
+        except PlanSchemaError:
+            return partial
+        # Repair can also recover the phase that was still streaming when the text stopped
+        if len(repaired[PHASES_KEY]) >= len(partial[PHASES_KEY]):
+            self.phases = repaired[PHASES_KEY]
+            return repaired
+        return partial
+
+
+def parse_plan_stream(chunks, on_phase=None):
+    """Consume an iterable of text chunks; calls ``on_phase(phase)`` as each phase completes."""
+    parser = PlanStreamParser()
+    for chunk in chunks:
+        for phase in parser.feed(chunk):
+            if on_phase is not None:
+                on_phase(phase)
+    return parser.finish(), parser
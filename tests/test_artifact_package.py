@@ -0,0 +1,80 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from artifacts import MANIFEST, ArtifactIntegrityError, ArtifactPackage, write_package
+from model_loading import ModelRegistry
+
+xgb = pytest.importorskip("xgboost")
+
+EMBEDDING_DIM = 4
+
+
+def encoders(phases=("Scope", "Design", "Construction")):
+    df = pd.DataFrame({"Project Phase Name": list(phases), "duration_days": [10.0, 20.0, 30.0][:len(phases)]})
+    return {
+        "ohe": OneHotEncoder(handle_unknown="ignore", sparse_output=False).fit(df[["Project Phase Name"]]),
+        "scaler": StandardScaler().fit(df[["duration_days"]]),
+    }
+
+
+@pytest.fixture
+def package_dir(tmp_path):
+    encs = encoders()
+    width = EMBEDDING_DIM + len(encs["ohe"].categories_[0]) + 1
+    rng = np.random.default_rng(0)
+    X = rng.random((50, width))
+    model = xgb.XGBRegressor(n_estimators=5, max_depth=2).fit(X, X.sum(axis=1))
+    path = str(tmp_path / "package")
+    write_package(boosters={"low": model, "mid": model}, encoders=encs, embedding_dim=EMBEDDING_DIM,
+                  feature_layouts={"low": ["ohe", "scaler"], "mid": ["ohe", "scaler"]}, package_dir=path)
+    return path
+
+
+def test_package_round_trip(package_dir):
+    package = ArtifactPackage(package_dir)
+    ohe = package.load("ohe")
+    df = pd.DataFrame({"Project Phase Name": ["Design", "Unknown"]})
+    np.testing.assert_array_equal(ohe.transform(df), encoders()["ohe"].transform(df))
+    model = package.load("low")
+    assert model.predict(np.zeros((2, EMBEDDING_DIM + 4))).shape == (2,)
+
+
+def test_modified_file_fails_the_hash_check(package_dir):
+    with open(os.path.join(package_dir, "low.ubj"), "ab") as f:
+        f.write(b"\0")
+    with pytest.raises(ArtifactIntegrityError, match="hash"):
+        ArtifactPackage(package_dir).load("low")
+
+
+def test_booster_with_refitted_encoder_is_rejected(package_dir):
+    # Re-fitting the encoder changes its fingerprint; the booster still records the old one
+    write_package(encoders={"ohe": encoders(("Scope", "Design"))["ohe"]}, package_dir=package_dir)
+    package = ArtifactPackage(package_dir)
+    package.load("ohe")
+    with pytest.raises(ArtifactIntegrityError, match="different 'ohe'"):
+        package.load("low")
+
+
+def test_unknown_format_version_is_rejected(package_dir):
+    path = os.path.join(package_dir, MANIFEST)
+    with open(path) as f:
+        manifest = json.load(f)
+    manifest["format_version"] = 99
+    with open(path, "w") as f:
+        json.dump(manifest, f)
+    with pytest.raises(ArtifactIntegrityError, match="format"):
+        ArtifactPackage(package_dir)
+
+
+def test_registry_falls_back_from_a_bucket_that_fails_its_checks(package_dir, capsys):
+    with open(os.path.join(package_dir, "low.ubj"), "ab") as f:
+        f.write(b"\0")
+    registry = ModelRegistry(base_path=os.path.dirname(package_dir))
+    model, used = registry.bucket_model("low")
+    assert used == "mid"
+    assert "Skipping low bucket model" in capsys.readouterr().out
@@ -0,0 +1,36 @@
+import os
+import stat
+
+import numpy as np
+
+from artifacts import atomic_write, write_text
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_atomic_write_publishes_readable_files(tmp_path):
+    path = str(tmp_path / "nested" / "meta.json")
+    atomic_write(path, lambda tmp: write_text(tmp, "{}"))
+    with open(path) as f:
+        assert f.read() == "{}"
+    # mkstemp's 0600 would hide the file from other users
+    assert mode(path) & stat.S_IRGRP and mode(path) & stat.S_IROTH
+    assert os.listdir(tmp_path / "nested") == ["meta.json"]
+
+
+def test_atomic_write_keeps_npy_suffix(tmp_path):
+    path = str(tmp_path / "X.npy")
+    atomic_write(path, lambda tmp: np.save(tmp, np.arange(3)), suffix=".npy")
+    np.testing.assert_array_equal(np.load(path), np.arange(3))
+
+
+def test_published_mode_follows_the_umask(tmp_path):
+    previous = os.umask(0o027)
+    try:
+        path = str(tmp_path / "model.ubj")
+        atomic_write(path, lambda tmp: write_text(tmp, "x"))
+    finally:
+        os.umask(previous)
+    assert mode(path) == 0o640
@@ -0,0 +1,46 @@
+import pytest
+
+from chat_history import compact_messages, message_tokens, record_usage
+
+
+def transcript(turns, length=400):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"answer {i} " + "detail " * (length // 7)})
+        history.append({"role": "assistant", "content": f"question {i + 1} " + "context " * (length // 8)})
+    history.append({"role": "user", "content": "current answer"})
+    return history
+
+
+@pytest.mark.parametrize("turns", [1, 5, 40])
+def test_prompt_stays_within_budget(turns):
+    messages = compact_messages("You are a helpful assistant.", transcript(turns), budget=300)
+    assert message_tokens(messages) <= 300
+
+
+def test_prompt_size_is_flat_as_the_conversation_grows():
+    sizes = [message_tokens(compact_messages("System.", transcript(n), budget=400)) for n in (10, 20, 40)]
+    assert max(sizes) <= 400
+    assert max(sizes) - min(sizes) < 20
+
+
+def test_keeps_system_prompt_last_exchange_and_current_message():
+    history = transcript(6, length=40)
+    messages = compact_messages("System.", history, budget=10_000)
+    assert messages[0]["role"] == "system" and messages[0]["content"].startswith("System.")
+    assert messages[1:] == history[-3:]
+    # Earlier user turns are summarised in the system prompt, oldest first
+    assert "answer 0" in messages[0]["content"] and "question 1" not in messages[0]["content"]
+
+
+def test_current_message_is_never_dropped():
+    history = transcript(3)
+    history[-1]["content"] = "x" * 4000
+    messages = compact_messages("System.", history, budget=100)
+    assert messages[-1] == history[-1]
+
+
+def test_record_usage_appends_the_estimate():
+    log = []
+    messages = [{"role": "user", "content": "12345678"}]
+    assert record_usage(log, messages) == log[0] == message_tokens(messages)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from cross_validation import MAX_LATENCY_PROXY, FoldMatrices, joint_score, latency_proxy
+
+pytest.importorskip("xgboost")
+
+PARAMS = {"max_depth": 3, "eta": 0.3, "objective": "reg:squarederror", "tree_method": "hist", "seed": 0}
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.random((300, 5))
+    return X, X @ np.arange(5.0) + rng.normal(scale=0.1, size=300)
+
+
+def test_joint_score_adds_weighted_latency():
+    assert latency_proxy(300, 15) == MAX_LATENCY_PROXY
+    assert joint_score(2.0, 4.0, 300, 15, latency_weight=0) == 0.5
+    assert joint_score(2.0, 4.0, 300, 15, latency_weight=0.1) == pytest.approx(0.6)
+    # Same accuracy: the smaller model scores better
+    assert joint_score(1.0, 1.0, 50, 3) < joint_score(1.0, 1.0, 300, 10)
+
+
+def test_evaluate_scores_every_fold(data):
+    X, y = data
+    cv = FoldMatrices(X, y, folds=4, threads=2)
+    result = cv.evaluate(PARAMS, 30)
+    assert len(result["fold_rmse"]) == 4
+    assert result["rmse"] == pytest.approx(np.mean(result["fold_rmse"]))
+    assert result["rmse"] < cv.y_scale
+    assert (result["trees"], result["stopped"]) == (30, False)
+
+
+def test_evaluate_is_the_same_sequential_or_parallel(data):
+    X, y = data
+    scores = [FoldMatrices(X, y, folds=4, threads=t).evaluate(PARAMS, 20)["fold_rmse"] for t in (1, 4, 8)]
+    np.testing.assert_allclose(scores[0], scores[1], rtol=1e-6)
+    np.testing.assert_allclose(scores[0], scores[2], rtol=1e-6)
+
+
+def test_on_iteration_can_stop_all_folds(data):
+    X, y = data
+    seen = []
+
+    def on_iteration(tree, rmse):
+        seen.append(tree)
+        return tree == 4
+
+    result = FoldMatrices(X, y, folds=3, threads=1).evaluate(PARAMS, 50, on_iteration)
+    assert seen == list(range(5))
+    assert result["stopped"]
+    assert result["trees"] < 50
@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache, normalize_text
+
+
+class FakeEncoder:
+    """Deterministic 3-d vectors derived from the text; counts encoded texts."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        self.encoded.extend(texts)
+        return np.array([[len(t), ord(t[0]), ord(t[-1])] for t in texts], dtype=np.float32)
+
+
+def expected(text):
+    return FakeEncoder().encode([normalize_text(text)])[0]
+
+
+def make_cache(tmp_path, encoder=None):
+    encoder = encoder or FakeEncoder()
+    return EmbeddingCache(lambda: encoder, "fake-encoder", cache_dir=str(tmp_path)), encoder
+
+
+def test_vectors_survive_a_restart(tmp_path):
+    cache, _ = make_cache(tmp_path)
+    cache.encode(["alpha", "beta  gamma"])
+
+    reopened, encoder = make_cache(tmp_path)
+    vectors = reopened.encode(["beta gamma", "alpha"])
+    assert encoder.encoded == []
+    np.testing.assert_array_equal(vectors, [expected("beta gamma"), expected("alpha")])
+    assert reopened.stats()["disk_hits"] == 2
+
+
+def test_orphan_vector_bytes_do_not_misalign_later_rows(tmp_path):
+    cache, _ = make_cache(tmp_path)
+    cache.encode(["alpha"])
+    # A writer that died after writing its vector but before its hash line
+    with open(cache._vectors_path, "ab") as f:
+        f.write(np.full(3, 99, dtype=np.float32).tobytes())
+
+    cache, _ = make_cache(tmp_path)
+    cache.encode(["beta"])
+
+    reopened, encoder = make_cache(tmp_path)
+    vectors = reopened.encode(["alpha", "beta"])
+    assert encoder.encoded == []
+    np.testing.assert_array_equal(vectors, [expected("alpha"), expected("beta")])
+    assert os.path.getsize(reopened._vectors_path) == 2 * 3 * 4
+
+
+def test_partial_hash_line_is_dropped_before_appending(tmp_path):
+    cache, _ = make_cache(tmp_path)
+    cache.encode(["alpha"])
+    with open(cache._vectors_path, "ab") as f:
+        f.write(np.full(3, 99, dtype=np.float32).tobytes())
+    with open(cache._hashes_path, "a", encoding="ascii") as f:
+        f.write("0123abc")
+
+    cache, _ = make_cache(tmp_path)
+    cache.encode(["beta"])
+
+    reopened, encoder = make_cache(tmp_path)
+    np.testing.assert_array_equal(reopened.encode(["beta", "alpha"]), [expected("beta"), expected("alpha")])
+    assert encoder.encoded == []
+    with open(reopened._hashes_path, encoding="ascii") as f:
+        assert all(len(line) == 40 for line in f.read().splitlines()[1:])
+
+
+def test_duplicates_are_encoded_once(tmp_path):
+    cache, encoder = make_cache(tmp_path)
+    vectors = cache.encode(["alpha", "alpha ", "beta", "alpha"])
+    assert encoder.encoded == ["alpha", "beta"]
+    assert vectors.shape == (4, 3)
@@ -0,0 +1,48 @@
+import numpy as np
+
+from embedding_store import EmbeddingStore
+
+
+class FakeEncoder:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, show_progress_bar=False):
+        self.encoded.extend(texts)
+        return np.array([[len(t), ord(t[0])] for t in texts], dtype=np.float32)
+
+
+def vectors(texts):
+    return np.array([[len(t), ord(t[0])] for t in texts], dtype=np.float32)
+
+
+def make_store(tmp_path, encoder):
+    return EmbeddingStore(lambda: encoder, "fake-encoder", store_dir=str(tmp_path), batch_size=2)
+
+
+def test_gather_returns_one_row_per_text(tmp_path):
+    encoder = FakeEncoder()
+    store = make_store(tmp_path, encoder)
+    texts = ["school", "gym", "school", "roof", "gym"]
+    np.testing.assert_array_equal(store.gather(texts), vectors(texts))
+    assert encoder.encoded == ["school", "gym", "roof"]
+    assert store.stats()["duplication_ratio"] == round(5 / 3, 2)
+
+
+def test_only_new_texts_are_encoded_across_runs(tmp_path):
+    make_store(tmp_path, FakeEncoder()).gather(["school", "gym"])
+
+    encoder = FakeEncoder()
+    store = make_store(tmp_path, encoder)
+    texts = ["gym", "annex", "school"]
+    np.testing.assert_array_equal(store.gather(texts), vectors(texts))
+    assert encoder.encoded == ["annex"]
+    assert isinstance(store.vectors, np.memmap)
+
+
+def test_store_for_another_encoder_is_not_reused(tmp_path):
+    make_store(tmp_path, FakeEncoder()).gather(["school"])
+    encoder = FakeEncoder()
+    other = EmbeddingStore(lambda: encoder, "other-encoder", store_dir=str(tmp_path))
+    other.gather(["school"])
+    assert encoder.encoded == ["school"]
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from estimation import PHASE_MAPPING, TRAINING_PHASE_NAMES, EstimationEngine
+from features import COST_CAT_COLS, COST_NUM_COLS, DURATION_CAT_COLS
+
+
+class FakeEmbedder:
+    def encode(self, texts, **kwargs):
+        return np.zeros((len(texts), 4), dtype=np.float32)
+
+
+class HotColumns:
+    """Stand-in duration model: predicts the number of hot one-hot columns in a row."""
+
+    def predict(self, X):
+        return X[:, 4:].sum(axis=1)
+
+
+class RecordingCostModel:
+    """Stand-in cost model: keeps the design matrix it was asked to score."""
+
+    def predict(self, X):
+        self.X = X
+        return np.ones(len(X))
+
+
+class FakeRegistry:
+    def __init__(self):
+        # Fitted on the CSV's phase names, like the trainers' encoders
+        train = pd.DataFrame({
+            "Project Phase Name": list(TRAINING_PHASE_NAMES.values()),
+            "project_status": "Complete",
+            "timeline_status": "Complete",
+            "end_date_missing": True,
+            "duration_days": [70.0, 140.0, 210.0, 280.0, 350.0],
+        })
+        self.cost_model = RecordingCostModel()
+        self.artifacts = {
+            "ohe": OneHotEncoder(handle_unknown="ignore", sparse_output=False).fit(train[COST_CAT_COLS]),
+            "scaler": StandardScaler().fit(train[COST_NUM_COLS]),
+            "ohe_duration": OneHotEncoder(handle_unknown="ignore", sparse_output=False).fit(train[DURATION_CAT_COLS]),
+            "duration": HotColumns(),
+        }
+
+    def get(self, name):
+        return self.artifacts.get(name)
+
+    def bucket_model(self, bucket):
+        return self.cost_model, bucket
+
+
+@pytest.fixture
+def engine():
+    return EstimationEngine(registry=FakeRegistry(), embedder=FakeEmbedder())
+
+
+def test_phase_codes_are_encoded_as_training_phase_names(engine):
+    codes = list(PHASE_MAPPING)
+    # Phase, status and timeline status are each one hot column
+    assert engine.predict_durations_batch(["new school"] * len(codes), codes) == [3.0] * len(codes)
+    assert engine.predict_durations_batch(["new school"], ["Design"]) == [3.0]
+
+
+def test_model_durations_batch_is_keyed_by_phase_code(engine):
+    weeks = engine.model_durations_batch(["new school", "gym addition"])
+    assert [list(w) for w in weeks] == [list(PHASE_MAPPING)] * 2
+    assert all(v == 3.0 for w in weeks for v in w.values())
+
+
+def test_each_phase_code_gets_its_own_cost_input(engine):
+    codes = list(PHASE_MAPPING)
+    engine.predict_costs(["new school"] * len(codes), codes, [10.0] * len(codes), "high")
+    phase_columns = engine.registry.cost_model.X[:, 4:4 + len(codes)]
+    # One distinct hot phase column per row, none all zeros
+    np.testing.assert_array_equal(phase_columns.sum(axis=1), np.ones(len(codes)))
+    assert len({tuple(row) for row in phase_columns}) == len(codes)
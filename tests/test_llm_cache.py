@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import pytest
+
+from llm_cache import CachedMistralClient, ResponseCache, cache_key
+
+MESSAGES = [{"role": "user", "content": "Plan a school"}]
+
+
+def choice(content, finish_reason):
+    return SimpleNamespace(message=SimpleNamespace(content=content), finish_reason=finish_reason)
+
+
+def stream_event(delta, finish_reason=None):
+    return SimpleNamespace(data=SimpleNamespace(
+        choices=[SimpleNamespace(delta=SimpleNamespace(content=delta), finish_reason=finish_reason)]))
+
+
+class FakeChat:
+    def __init__(self, content="{}", finish_reason="stop"):
+        self.content = content
+        self.finish_reason = finish_reason
+        self.calls = 0
+
+    def complete(self, model, messages, **params):
+        self.calls += 1
+        return SimpleNamespace(choices=[choice(self.content, self.finish_reason)])
+
+    def stream(self, model, messages, **params):
+        self.calls += 1
+        yield stream_event(self.content[:2])
+        yield stream_event(self.content[2:], self.finish_reason)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(path=str(tmp_path / "llm.sqlite3"))
+
+
+def client(cache, **chat_kwargs):
+    chat = FakeChat(**chat_kwargs)
+    return CachedMistralClient(SimpleNamespace(chat=chat), cache=cache), chat
+
+
+def test_finished_reply_is_served_from_cache(cache):
+    mistral, chat = client(cache, content='{"a": 1}')
+    mistral.chat.complete(model="m", messages=MESSAGES)
+    response = mistral.chat.complete(model="m", messages=MESSAGES)
+    assert chat.calls == 1
+    assert response.cached
+    assert response.choices[0].message.content == '{"a": 1}'
+
+
+@pytest.mark.parametrize("content, finish_reason", [('{"a": ', "length"), ("", "stop"), ('{"a": 1}', None)])
+def test_unfinished_or_empty_replies_are_not_cached(cache, content, finish_reason):
+    mistral, chat = client(cache, content=content, finish_reason=finish_reason)
+    mistral.chat.complete(model="m", messages=MESSAGES)
+    mistral.chat.complete(model="m", messages=MESSAGES)
+    assert chat.calls == 2
+
+
+def test_enum_finish_reason_counts_as_finished(cache):
+    mistral, chat = client(cache, finish_reason=SimpleNamespace(value="stop"))
+    mistral.chat.complete(model="m", messages=MESSAGES)
+    mistral.chat.complete(model="m", messages=MESSAGES)
+    assert chat.calls == 1
+
+
+@pytest.mark.parametrize("finish_reason, calls", [("stop", 1), ("length", 2)])
+def test_streamed_reply_is_cached_only_when_finished(cache, finish_reason, calls):
+    mistral, chat = client(cache, content='{"a": 1}', finish_reason=finish_reason)
+    assert "".join(mistral.chat.stream_text(model="m", messages=MESSAGES)) == '{"a": 1}'
+    assert "".join(mistral.chat.stream_text(model="m", messages=MESSAGES)) == '{"a": 1}'
+    assert chat.calls == calls
+
+
+def test_evict_forgets_a_stored_reply(cache):
+    mistral, chat = client(cache)
+    mistral.chat.complete(model="m", messages=MESSAGES, response_format={"type": "json_object"})
+    mistral.chat.evict(model="m", messages=MESSAGES, response_format={"type": "json_object"})
+    mistral.chat.complete(model="m", messages=MESSAGES, response_format={"type": "json_object"})
+    assert chat.calls == 2
+
+
+def test_cache_key_ignores_whitespace_and_transport_options():
+    padded = [{"role": "user", "content": "  Plan a school\n"}]
+    assert cache_key("m", MESSAGES) == cache_key("m", padded, timeout_ms=5000)
+    assert cache_key("m", MESSAGES) != cache_key("m", MESSAGES, temperature=0.2)
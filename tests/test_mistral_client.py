@@ -0,0 +1,102 @@
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import mistral_client
+from mistral_client import ResilientChat, TokenBucket
+
+
+class APIError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.raw_response = SimpleNamespace(headers=headers)
+
+
+class OpenLimiter:
+    def acquire(self, deadline=None):
+        return True
+
+
+class FlakyChat:
+    """Raises the queued errors in order, then returns "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.timeouts = []
+
+    def complete(self, timeout_ms=None, **params):
+        self.timeouts.append(timeout_ms)
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(mistral_client.time, "sleep", slept.append)
+    return slept
+
+
+def test_token_bucket_allows_a_burst_then_refuses_past_the_deadline():
+    bucket = TokenBucket(rate=0.5, capacity=3)
+    assert all(bucket.acquire() for _ in range(3))
+    # The next token is ~2s away
+    assert not bucket.acquire(deadline=time.monotonic() + 0.1)
+
+
+def test_token_bucket_waits_for_a_refill():
+    bucket = TokenBucket(rate=50, capacity=1)
+    assert bucket.acquire()
+    start = time.monotonic()
+    assert bucket.acquire(deadline=start + 1)
+    assert time.monotonic() - start >= 0.015
+
+
+def test_zero_rate_disables_limiting():
+    bucket = TokenBucket(rate=0, capacity=1)
+    assert all(bucket.acquire(deadline=time.monotonic()) for _ in range(10))
+
+
+def test_retryable_errors_are_retried(sleeps):
+    chat = FlakyChat(APIError(503), httpx.ConnectError("reset"), APIError(429, retry_after=2))
+    resilient = ResilientChat(chat, OpenLimiter(), max_retries=3)
+    assert resilient.complete(model="m", timeout_ms=60000) == "ok"
+    assert resilient.counters == {"calls": 1, "retries": 3, "failures": 0}
+    assert sleeps[-1] == 2  # Retry-After is honoured
+    # Each attempt only gets what is left of the deadline
+    assert chat.timeouts == sorted(chat.timeouts, reverse=True) and chat.timeouts[0] <= 60000
+
+
+def test_client_errors_are_not_retried(sleeps):
+    resilient = ResilientChat(FlakyChat(APIError(400)), OpenLimiter())
+    with pytest.raises(APIError):
+        resilient.complete(model="m")
+    assert resilient.counters == {"calls": 1, "retries": 0, "failures": 1}
+    assert sleeps == []
+
+
+def test_retries_stop_at_max_retries(sleeps):
+    resilient = ResilientChat(FlakyChat(*[APIError(502)] * 5), OpenLimiter(), max_retries=2)
+    with pytest.raises(APIError):
+        resilient.complete(model="m")
+    assert resilient.counters["retries"] == 2
+
+
+def test_no_retry_that_would_overrun_the_deadline(sleeps):
+    resilient = ResilientChat(FlakyChat(APIError(429, retry_after=30)), OpenLimiter())
+    with pytest.raises(APIError):
+        resilient.complete(model="m", timeout_ms=5000)
+    assert sleeps == []
+
+
+def test_rate_limit_queue_past_the_deadline_times_out():
+    limiter = TokenBucket(rate=0.01, capacity=1)
+    limiter.acquire()
+    resilient = ResilientChat(FlakyChat(), limiter)
+    with pytest.raises(TimeoutError):
+        resilient.complete(model="m", timeout_ms=100)
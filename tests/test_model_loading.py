@@ -0,0 +1,68 @@
+import pickle
+
+import pytest
+
+from model_loading import ARTIFACTS, BUCKET_FALLBACKS, MissingArtifactError, ModelRegistry
+
+
+def write_pickles(base_path, names, size=100_000):
+    for name in names:
+        with open(base_path / ARTIFACTS[name], "wb") as f:
+            pickle.dump({"name": name, "payload": b"x" * size}, f)
+
+
+def test_buckets_load_lazily_and_once(tmp_path):
+    write_pickles(tmp_path, ["low", "mid", "ohe"])
+    registry = ModelRegistry(base_path=str(tmp_path))
+    assert registry.stats()["artifacts"] == {}
+    first = registry.get("low")
+    assert registry.get("low") is first
+    assert registry.get("ohe") is registry.get("ohe")
+    assert set(registry.stats()["artifacts"]) == {"low", "ohe"}
+
+
+def test_lru_evicts_least_recently_used_bucket_over_budget(tmp_path):
+    write_pickles(tmp_path, ["low", "mid", "high"])
+    # Room for two ~100 KB buckets, not three
+    registry = ModelRegistry(base_path=str(tmp_path), bucket_budget_mb=0.25)
+    registry.get("low")
+    registry.get("mid")
+    registry.get("low")  # mid is now the least recently used
+    registry.get("high")
+    stats = registry.stats()
+    assert stats["resident_buckets"] == ["low", "high"]
+    assert stats["bucket_evictions"] == 1
+
+
+def test_most_recent_bucket_is_kept_even_over_budget(tmp_path):
+    write_pickles(tmp_path, ["low", "mid"])
+    registry = ModelRegistry(base_path=str(tmp_path), bucket_budget_mb=0.01)
+    registry.get("low")
+    assert registry.get("mid")["name"] == "mid"
+    assert registry.stats()["resident_buckets"] == ["mid"]
+
+
+@pytest.mark.parametrize("requested, present, used", [
+    ("high", ["high", "mid"], "high"),
+    ("high", ["mid", "low"], "mid"),
+    ("low", ["high"], "high"),
+    ("mid", ["low"], "low"),
+])
+def test_bucket_model_follows_the_fallback_order(tmp_path, requested, present, used):
+    write_pickles(tmp_path, present, size=10)
+    model, bucket = ModelRegistry(base_path=str(tmp_path)).bucket_model(requested)
+    assert bucket == used and model["name"] == used
+
+
+def test_missing_buckets_and_artifacts_raise(tmp_path):
+    registry = ModelRegistry(base_path=str(tmp_path))
+    with pytest.raises(MissingArtifactError):
+        registry.bucket_model("low")
+    with pytest.raises(MissingArtifactError):
+        registry.get("duration")
+    assert not registry.available("duration")
+
+
+def test_every_bucket_falls_back_to_the_other_two():
+    for bucket, fallbacks in BUCKET_FALLBACKS.items():
+        assert sorted([bucket, *fallbacks]) == ["high", "low", "mid"]
@@ -0,0 +1,43 @@
+import pytest
+
+from plan_schema import PlanSchemaError, parse_durations, repair_json, to_number, to_weeks
+
+PHASES = ["I. Scope", "II. Design", "III. Commissioning", "IV. Purch & Install", "V. Construction"]
+
+
+def test_repair_json_strips_fences_prose_and_trailing_commas():
+    text = 'Here is the plan:\n```json\n{"ConstructionPhases": [{"PhaseName": "Design",},],}\n```'
+    assert repair_json(text) == {"ConstructionPhases": [{"PhaseName": "Design"}]}
+
+
+def test_repair_json_closes_a_truncated_reply():
+    text = '{"ConstructionPhases": [{"PhaseName": "Scope"}, {"PhaseName": "Desi'
+    assert repair_json(text)["ConstructionPhases"][0] == {"PhaseName": "Scope"}
+
+
+def test_repair_json_rejects_text_without_json():
+    with pytest.raises(PlanSchemaError):
+        repair_json("Sorry, I can't help with that.")
+
+
+@pytest.mark.parametrize("value, number", [
+    ("$1,200,000", 1200000), ("1.2M", 1.2e6), ("8-10", 9), ("250k", 250000), (7, 7), ("n/a", 0.0),
+])
+def test_to_number(value, number):
+    assert to_number(value) == pytest.approx(number)
+
+
+@pytest.mark.parametrize("value, weeks", [("12 weeks", 12), ("3 months", 3 * 4.345), ("14 days", 2), ("1 year", 52.14)])
+def test_to_weeks(value, weeks):
+    assert to_weeks(value) == pytest.approx(weeks)
+
+
+def test_parse_durations_matches_phases_by_numeral():
+    text = '{"I. Site Preparation": "4 weeks", "ii. design": 20, "V. Construction": "2 years", "IV": "n/a"}'
+    durations = parse_durations(text, PHASES)
+    assert durations == pytest.approx({"I. Scope": 4, "II. Design": 20, "V. Construction": 104.28})
+
+
+def test_parse_durations_without_usable_values_raises():
+    with pytest.raises(PlanSchemaError):
+        parse_durations('{"I. Scope": "unknown"}', PHASES)
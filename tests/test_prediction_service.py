@@ -0,0 +1,22 @@
+import pytest
+
+import prediction_service
+from prediction_service import estimate
+
+
+def no_engine():
+    raise AssertionError("the engine must not be loaded for an invalid request")
+
+
+@pytest.mark.parametrize("bucket", ["extreme", "ohe", "duration", "", None, 3, ["high"]])
+def test_unknown_bucket_is_rejected_before_the_engine_loads(monkeypatch, bucket):
+    monkeypatch.setattr(prediction_service, "get_engine", no_engine)
+    with pytest.raises(ValueError, match="bucket"):
+        estimate({"bucket": bucket, "description": "New elementary school"})
+
+
+@pytest.mark.parametrize("payload", [{"items": []}, {"items": [{"description": "  "}]}, {"description": 5}])
+def test_items_need_descriptions(monkeypatch, payload):
+    monkeypatch.setattr(prediction_service, "get_engine", lambda: object())
+    with pytest.raises(ValueError):
+        estimate({"bucket": "low", **payload})
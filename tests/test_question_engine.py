@@ -0,0 +1,81 @@
+import pytest
+
+from question_engine import (
+    QuestionEngine, is_clarification, normalize_grades, normalize_location, normalize_special_reqs,
+    normalize_square_footage, normalize_timeline,
+)
+
+
+@pytest.mark.parametrize("text, borough", [
+    ("Queens, New York", "Queens"),
+    ("Brooklyn, NY", "Brooklyn"),
+    ("Staten Island, New York", "Staten Island"),
+    ("somewhere in the Bronx, NY", "Bronx"),
+    ("Harlem", "Manhattan"),
+    ("New York", "Manhattan"),
+    ("new york, ny", "Manhattan"),
+])
+def test_normalize_location(text, borough):
+    answer = normalize_location(text)
+    assert answer.ok and answer.value == borough
+
+
+@pytest.mark.parametrize("text", ["NYC", "Jersey City", "Sunnyside"])
+def test_normalize_location_asks_for_a_borough(text):
+    assert not normalize_location(text).ok
+
+
+@pytest.mark.parametrize("text", ["Do not know", "Is fine as is", "none", "Can't say, maybe 18 months", "How about 20"])
+def test_answers_are_not_clarifications(text):
+    assert not is_clarification(text)
+
+
+@pytest.mark.parametrize("text", [
+    "What does square footage include?", "why do you need this", "How much do schools usually cost",
+    "can you explain", "Manhattan?", "Could I skip this one",
+])
+def test_questions_are_clarifications(text):
+    assert is_clarification(text)
+
+
+@pytest.mark.parametrize("text, months", [("two and a half years", 30), ("18 months", 18), ("3 years", 36)])
+def test_normalize_timeline(text, months):
+    assert normalize_timeline(text).value == months
+
+
+def test_normalize_grades_counts_a_span():
+    assert normalize_grades("K-5").value == 6
+    assert normalize_grades("grades 6 to 8").value == 3
+
+
+def test_normalize_square_footage_and_special_reqs():
+    assert normalize_square_footage("about 80k sq ft").value == 80000
+    assert not normalize_square_footage("big").ok
+    assert normalize_special_reqs("None.").value == "None"
+
+
+@pytest.mark.parametrize("key, text, value", [
+    ("Location", "Manhattan?", "Manhattan"),
+    ("Grades", "3?", 3),
+    ("Timeline", "Maybe 18 months?", 18),
+])
+def test_hesitant_answers_are_answers(key, text, value):
+    answer, clarification = QuestionEngine(stats={}).read(key, text)
+    assert not clarification and answer.value == value
+
+
+@pytest.mark.parametrize("key, text", [
+    ("Location", "Which boroughs count?"),
+    ("Grades", "How many grades does a middle school have"),
+    ("StudentsPerClass", "3?"),
+    ("ProjectDescription", "What should I write here?"),
+    ("SpecialReqs", "what counts as a special requirement"),
+])
+def test_questions_about_the_question_are_clarifications(key, text):
+    answer, clarification = QuestionEngine(stats={}).read(key, text)
+    assert clarification
+
+
+def test_rejected_answer_that_is_not_a_question_gets_the_hint():
+    answer, clarification = QuestionEngine(stats={}).read("Location", "Do not know")
+    assert not clarification and not answer.ok
@@ -0,0 +1,37 @@
+from stream_json import parse_plan_stream
+
+PLAN = ('{"ConstructionPhases": [{"PhaseName": "Scope", "Subtasks": ["Survey"]}, '
+        '{"PhaseName": "Design", "DurationEstimate": "3 months"}], '
+        '"Resources & Materials": {"Materials": [{"Item": "Steel", "EstimatedCost": "$2M"}]}}')
+
+
+def chunks(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_phases_are_emitted_as_they_close():
+    seen = []
+    plan, parser = parse_plan_stream(chunks(PLAN), on_phase=seen.append)
+    assert [p["PhaseName"] for p in seen] == ["Scope", "Design"]
+    assert plan["ConstructionPhases"] == seen
+    assert plan["Resources & Materials"]["Materials"][0]["EstimatedCost"] == 2e6
+    assert not parser.truncated
+
+
+def test_complete_reply_that_needs_repair_is_not_truncated():
+    text = "Sure! Here is the plan:\n" + PLAN.replace('"Survey"]', '"Survey",]') + "\nLet me know."
+    plan, parser = parse_plan_stream(chunks(text))
+    assert not parser.truncated
+    assert [p["PhaseName"] for p in plan["ConstructionPhases"]] == ["Scope", "Design"]
+
+
+def test_cut_off_reply_is_truncated_and_keeps_completed_phases():
+    plan, parser = parse_plan_stream(chunks(PLAN[:PLAN.index("Design") + 3]))
+    assert parser.truncated
+    assert plan["ConstructionPhases"][0]["PhaseName"] == "Scope"
+
+
+def test_complete_reply_without_phases_has_no_phases():
+    plan, parser = parse_plan_stream(["{}"])
+    assert not parser.truncated
+    assert plan["ConstructionPhases"] == []
@@ -0,0 +1,37 @@
+import os
+
+import numpy as np
+import pytest
+
+import training_driver
+
+
+class FailedProc:
+    """Records the command line it was started with and exits non-zero."""
+
+    started = []
+
+    def __init__(self, args):
+        self.args = args
+        FailedProc.started.append(args)
+
+    def wait(self):
+        return 1
+
+
+def test_bucket_worker_command_parses(tmp_path, monkeypatch):
+    FailedProc.started = []
+    monkeypatch.setattr(training_driver.subprocess, "Popen", FailedProc)
+    monkeypatch.setattr(training_driver, "WORK_DIR", str(tmp_path / "work"))
+    rng = np.random.default_rng(0)
+    X, y = rng.random((40, 3)), rng.random(40)
+    with pytest.raises(RuntimeError, match="low"):
+        training_driver.train_buckets({"low": (X, y, "low.pkl")}, str(tmp_path / "models"), workers=2)
+
+    (command,) = FailedProc.started
+    args = training_driver._worker_parser().parse_args(command[2:])
+    assert args.bucket == "low"
+    assert args.model_path == os.path.join(str(tmp_path / "models"), "low.pkl")
+    assert [os.path.basename(p) for p in args.data] == ["X.npy", "y.npy"]
+    # The bucket's matrices are removed once its process has exited
+    assert not os.listdir(tmp_path / "work")
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from tree_compiler import SmallBatchForest, compile_booster
+
+xgb = pytest.importorskip("xgboost")
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 6)).astype(np.float32)
+    y = 3 * X[:, 0] - 2 * np.abs(X[:, 1]) + (X[:, 2] > 0.5)
+    # Missing values in training make XGBoost learn a default direction per split
+    X[rng.random(X.shape) < 0.15] = np.nan
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def model(data):
+    X, y = data
+    return xgb.XGBRegressor(n_estimators=40, max_depth=5, tree_method="hist", random_state=0).fit(X, y)
+
+
+def test_compiled_forest_matches_xgboost(data, model):
+    X, _ = data
+    forest = compile_booster(model)
+    np.testing.assert_allclose(forest.predict(X), model.predict(X), rtol=1e-5, atol=1e-4)
+    np.testing.assert_allclose(forest.predict(X[0]), model.predict(X[:1]), rtol=1e-5, atol=1e-4)
+
+
+def test_missing_values_follow_the_default_direction(data, model):
+    X, _ = data
+    forest = compile_booster(model)
+    assert forest.default_left.any() and not forest.default_left.all()
+    all_missing = np.full((3, X.shape[1]), np.nan, dtype=np.float32)
+    partly_missing = X[:20].copy()
+    partly_missing[:, ::2] = np.nan
+    for rows in (all_missing, partly_missing):
+        np.testing.assert_allclose(forest.predict(rows), model.predict(rows), rtol=1e-5, atol=1e-4)
+
+
+def test_native_booster_and_early_stopping(data):
+    X, y = data
+    model = xgb.XGBRegressor(n_estimators=200, max_depth=4, early_stopping_rounds=3, random_state=0)
+    model.fit(X[:300], y[:300], eval_set=[(X[300:], y[300:])], verbose=False)
+    assert model.best_iteration < 199
+    np.testing.assert_allclose(compile_booster(model).predict(X), model.predict(X), rtol=1e-5, atol=1e-4)
+    booster = xgb.train({"max_depth": 3}, xgb.DMatrix(X, y), num_boost_round=10)
+    np.testing.assert_allclose(compile_booster(booster).predict(X), booster.inplace_predict(X), rtol=1e-5, atol=1e-4)
+
+
+def test_wrong_feature_count_and_unsupported_objective(data, model):
+    X, y = data
+    with pytest.raises(ValueError, match="features"):
+        compile_booster(model).predict(X[:, :3])
+    logistic = xgb.XGBClassifier(n_estimators=2).fit(X, y > 0)
+    with pytest.raises(ValueError, match="objective"):
+        compile_booster(logistic)
+
+
+def test_small_batch_forest_routes_by_batch_size(data, model):
+    X, _ = data
+    routed = SmallBatchForest(model, max_rows=4)
+
+    class Unused:
+        def predict(self, X):
+            raise AssertionError("batch sent to the wrong evaluator")
+
+    routed.forest, forest = Unused(), routed.forest
+    np.testing.assert_allclose(routed.predict(X[:5]), model.predict(X[:5]), rtol=1e-6)
+    routed.forest, routed.model = forest, Unused()
+    np.testing.assert_allclose(routed.predict(X[:4]), model.predict(X[:4]), rtol=1e-5, atol=1e-4)
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pytest
+
+import tuning
+
+
+class FailedProc:
+    """Records the command line it was started with and exits non-zero."""
+
+    started = []
+
+    def __init__(self, args):
+        self.args = args
+        FailedProc.started.append(args)
+
+    def wait(self):
+        return 1
+
+
+@pytest.fixture
+def popen(monkeypatch):
+    FailedProc.started = []
+    monkeypatch.setattr(tuning.subprocess, "Popen", FailedProc)
+    return FailedProc.started
+
+
+def data(rows=40):
+    rng = np.random.default_rng(0)
+    return rng.random((rows, 3)), rng.random(rows)
+
+
+def test_tuning_worker_command_parses(tmp_path, popen):
+    X, y = data()
+    with pytest.raises(RuntimeError, match="tuning worker"):
+        tuning.tune("cost-test", X, y, n_trials=4, workers=2, storage_dir=str(tmp_path), cores=2, folds=3)
+
+    assert len(popen) == 2
+    for command in popen:
+        args = tuning._worker_parser().parse_args(command[2:])
+        assert (args.trials, args.threads, args.folds) == (2, 1, 3)
+    assert not os.listdir(tmp_path / "data")
+
+
+def test_worker_parser_rejects_a_short_command():
+    with pytest.raises(SystemExit):
+        tuning._worker_parser().parse_args(["--worker", "study", "X.npy", "y.npy"])
+
+
+def test_save_arrays_reuses_mapped_npy_files(tmp_path):
+    X, _ = data()
+    x_path = str(tmp_path / "X.npy")
+    np.save(x_path, X.astype(np.float32))
+    mapped = np.load(x_path, mmap_mode="r")
+    data_dir = str(tmp_path / "copies")
+
+    assert tuning.save_arrays({"X": mapped}, data_dir) == [x_path]
+    assert not os.path.exists(data_dir)
+
+    # A slice of the mapped file is a different array and gets its own copy
+    (sliced,) = tuning.save_arrays({"X": mapped[:10]}, data_dir)
+    assert sliced == os.path.join(data_dir, "X.npy")
+    np.testing.assert_array_equal(np.load(sliced), mapped[:10])
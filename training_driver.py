@@ -0,0 +1,126 @@
+"""Train the cost-bucket models concurrently.
+
+``train_buckets`` writes each bucket's design matrix once as float32 ``.npy``
+files (shared with its tuning workers and removed afterwards) and starts one ``python training_driver.py --bucket`` process per bucket,
+with the cores split evenly between them. Each bucket process tunes its model
+(``tuning.tune``, which reuses prebuilt per-fold QuantileDMatrix pairs), fits
+the final histogram-method booster on the whole bucket and writes the legacy
+pickle with an atomic rename. The parent then adds the boosters to the
+versioned package, which is also written atomically (``artifacts.write_package``).
+
+Every bucket reports how long its tuning and final fit took.
+"""
+import argparse
+import json
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from artifacts import atomic_write
+from tuning import WORKERS, fingerprint_arrays, save_arrays, tune
+
+WORK_DIR = os.environ.get("SOLACE_TRAINING_WORK_DIR", os.path.join("cache", "training"))
+
+
+def _write_pickle(obj, path):
+    with open(path, "wb") as f:
+        pickle.dump(obj, f)
+
+
+def atomic_pickle(obj, path):
+    """Pickle to a temp file next to ``path`` and rename it into place."""
+    atomic_write(path, lambda tmp: _write_pickle(obj, tmp))
+
+
+def train_bucket(name, X, y, model_path, cores, tune_workers):
+    """Tune and fit one bucket's model, pickle it to ``model_path``; returns its timings."""
+    from xgboost import XGBRegressor
+
+    timings = {}
+    start = time.perf_counter()
+    best_params = tune(f"cost-{name}", X, y, workers=tune_workers, cores=cores)
+    timings["tune_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model = XGBRegressor(**best_params, n_jobs=cores)
+    model.fit(X, y)
+    timings["fit_s"] = time.perf_counter() - start
+
+    atomic_pickle(model, model_path)
+    timings["rows"] = int(len(y))
+    return timings
+
+
+def train_buckets(buckets, model_dir, workers=WORKERS):
+    """Train every bucket in parallel processes.
+
+    ``buckets`` maps bucket name -> (X, y, pickle filename). Returns
+    ``(models, timings)`` keyed by bucket name.
+    """
+    if not buckets:
+        return {}, {}
+    cpus = os.cpu_count() or 1
+    cores = max(1, cpus // len(buckets))
+    tune_workers = max(1, min(workers, cpus) // len(buckets))
+
+    procs = {}
+    try:
+        for name, (X, y, filename) in buckets.items():
+            X = np.asarray(X, dtype=np.float32)
+            data_dir = os.path.join(WORK_DIR, f"{name}-{fingerprint_arrays(X, y)}")
+            x_path, y_path = save_arrays({"X": X, "y": y}, data_dir)
+            timings_path = os.path.join(data_dir, "timings.json")
+            procs[name] = (subprocess.Popen([
+                sys.executable, os.path.abspath(__file__), "--bucket", name,
+                "--model-path", os.path.join(model_dir, filename), "--timings-path", timings_path,
+                "--cores", str(cores), "--tune-workers", str(tune_workers), x_path, y_path,
+            ]), data_dir, timings_path, filename)
+
+        models, timings = {}, {}
+        failed = []
+        for name, (proc, _, timings_path, filename) in procs.items():
+            if proc.wait() != 0:
+                failed.append(name)
+                continue
+            with open(timings_path) as f:
+                timings[name] = json.load(f)
+            with open(os.path.join(model_dir, filename), "rb") as f:
+                models[name] = pickle.load(f)
+    finally:
+        for proc, data_dir, _, _ in procs.values():
+            proc.wait()
+            shutil.rmtree(data_dir, ignore_errors=True)
+    if failed:
+        raise RuntimeError(f"Training failed for bucket(s): {', '.join(failed)}")
+    return models, timings
+
+
+def print_timings(timings):
+    print(f"\n{'bucket':<8}{'rows':>8}{'tune s':>10}{'fit s':>10}")
+    for name, t in timings.items():
+        print(f"{name:<8}{t['rows']:>8}{t['tune_s']:>10.1f}{t['fit_s']:>10.1f}")
+
+
+def _worker_parser():
+    parser = argparse.ArgumentParser(description="Bucket training worker (started by train_buckets())")
+    parser.add_argument("--bucket", required=True)
+    parser.add_argument("--model-path", required=True)
+    parser.add_argument("--timings-path", required=True)
+    parser.add_argument("--cores", type=int, required=True)
+    parser.add_argument("--tune-workers", type=int, required=True)
+    parser.add_argument("data", nargs=2, metavar=("X.npy", "Y.npy"))
+    return parser
+
+
+if __name__ == "__main__":
+    args = _worker_parser().parse_args()
+    X, y = (np.load(p, mmap_mode="r") for p in args.data)
+    # X and y are passed to the tuning workers by path, not copied again
+    result = train_bucket(args.bucket, X, y, args.model_path, args.cores, args.tune_workers)
+    with open(args.timings_path, "w") as f:
+        json.dump(result, f)
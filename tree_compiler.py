@@ -0,0 +1,172 @@
+import json
+import os
+
+import numpy as np
+
+# Objectives whose prediction is the raw margin (no link function)
+IDENTITY_OBJECTIVES = {
+    "reg:squarederror",
+    "reg:squaredlogerror",
+    "reg:absoluteerror",
+    "reg:pseudohubererror",
+    "reg:quantileerror",
+}
+
+ROW_CHUNK = 4096
+
+# Largest batch scored by the compiled forest; bigger ones go to XGBoost. Per
+# benchmark_tree_eval.py the forest is ~3x faster than predict at 1 row, about
+# even at 10 and ~7x slower at 1000 (it does a NumPy pass per tree level).
+NATIVE_MAX_ROWS = int(os.environ.get("SOLACE_NATIVE_MAX_ROWS", 8))
+
+
+def _parse_float(value):
+    # XGBoost >= 3 writes base_score as "[5E-1]", older versions as "5E-1"
+    return float(str(value).strip("[]").split(",")[0])
+
+
+class CompiledForest:
+    """Gradient-boosted trees flattened into NumPy node arrays.
+
+    Every node of every tree lives in one set of parallel arrays; ``roots``
+    holds the index of each tree's first node and ``left == -1`` marks a leaf.
+    ``predict`` walks all trees for all rows at once, one tree level per step,
+    which avoids XGBoost's per-call DMatrix and thread-pool setup for the
+    handful of rows the app scores at a time.
+    """
+
+    def __init__(self, feature, threshold, left, right, default_left, leaf,
+                 roots, tree_weights, base_score, num_features, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.leaf = leaf
+        self.roots = roots
+        self.tree_weights = tree_weights
+        self.base_score = float(base_score)
+        self.num_features = int(num_features)
+        self.max_depth = int(max_depth)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.num_features:
+            raise ValueError(f"Expected {self.num_features} features, got {X.shape[1]}")
+        out = np.empty(len(X), dtype=np.float32)
+        for start in range(0, len(X), ROW_CHUNK):
+            out[start:start + ROW_CHUNK] = self._predict_chunk(X[start:start + ROW_CHUNK])
+        return out
+
+    def _predict_chunk(self, X):
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            left = self.left[node]
+            internal = left != -1
+            if not internal.any():
+                break
+            x = X[rows, self.feature[node]]
+            go_left = np.where(np.isnan(x), self.default_left[node], x < self.threshold[node])
+            node = np.where(internal, np.where(go_left, left, self.right[node]), node)
+        margins = (self.leaf[node] * self.tree_weights).sum(axis=1, dtype=np.float64)
+        return margins + self.base_score
+
+
+class SmallBatchForest:
+    """Scores batches of up to ``max_rows`` with the compiled forest, larger ones with XGBoost."""
+
+    def __init__(self, model, max_rows=NATIVE_MAX_ROWS):
+        self.model = model
+        self.forest = compile_booster(model)
+        self.max_rows = max_rows
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1 or len(X) <= self.max_rows:
+            return self.forest.predict(X)
+        return self.model.predict(X)
+
+
+def _tree_depth(left, right):
+    depth = 0
+    frontier = [0]
+    while frontier:
+        depth += 1
+        frontier = [c for n in frontier if left[n] != -1 for c in (left[n], right[n])]
+    return depth
+
+
+def compile_booster(model):
+    """Compile an XGBRegressor or xgboost.Booster into a CompiledForest."""
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    config = json.loads(booster.save_raw("json").decode("utf-8"))["learner"]
+
+    objective = config["objective"]["name"]
+    if objective not in IDENTITY_OBJECTIVES:
+        raise ValueError(f"Unsupported objective for native evaluation: {objective}")
+
+    gbm = config["gradient_booster"]
+    if gbm["name"] == "dart":
+        trees = gbm["gbtree"]["model"]["trees"]
+        weights = [float(w) for w in gbm["weight_drop"]]
+    elif gbm["name"] == "gbtree":
+        trees = gbm["model"]["trees"]
+        weights = [1.0] * len(trees)
+    else:
+        raise ValueError(f"Unsupported booster type: {gbm['name']}")
+
+    # Honour early stopping the same way XGBRegressor.predict does
+    try:
+        best_iteration = model.best_iteration
+    except AttributeError:
+        best_iteration = None
+    if best_iteration is not None:
+        per_round = int(gbm.get("gbtree", gbm)["model"]["gbtree_model_param"].get("num_parallel_tree", 1))
+        trees = trees[:(best_iteration + 1) * per_round]
+        weights = weights[:len(trees)]
+
+    if not trees:
+        raise ValueError("Booster has no trees to compile")
+
+    feature, threshold, left, right, default_left, leaf, roots = [], [], [], [], [], [], []
+    max_depth = 1
+    offset = 0
+    for tree in trees:
+        if any(tree.get("split_type", [])):
+            raise ValueError("Categorical splits are not supported by the native evaluator")
+        t_left = np.asarray(tree["left_children"], dtype=np.int32)
+        t_right = np.asarray(tree["right_children"], dtype=np.int32)
+        t_cond = np.asarray(tree["split_conditions"], dtype=np.float32)
+        is_leaf = t_left == -1
+
+        roots.append(offset)
+        feature.append(np.asarray(tree["split_indices"], dtype=np.int32))
+        threshold.append(t_cond)
+        left.append(np.where(is_leaf, -1, t_left + offset))
+        right.append(np.where(is_leaf, -1, t_right + offset))
+        default_left.append(np.asarray(tree["default_left"], dtype=bool))
+        # For leaf nodes XGBoost stores the leaf value in split_conditions
+        leaf.append(np.where(is_leaf, t_cond, 0).astype(np.float32))
+        max_depth = max(max_depth, _tree_depth(t_left, t_right))
+        offset += len(t_left)
+
+    return CompiledForest(
+        feature=np.concatenate(feature),
+        threshold=np.concatenate(threshold),
+        left=np.concatenate(left).astype(np.int32),
+        right=np.concatenate(right).astype(np.int32),
+        default_left=np.concatenate(default_left),
+        leaf=np.concatenate(leaf),
+        roots=np.asarray(roots, dtype=np.int32),
+        tree_weights=np.asarray(weights, dtype=np.float32),
+        base_score=_parse_float(config["learner_model_param"]["base_score"]),
+        num_features=int(config["learner_model_param"]["num_feature"]),
+        max_depth=max_depth,
+    )
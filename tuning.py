@@ -0,0 +1,232 @@
+"""Parallel, resumable Optuna search for the XGBoost models.
+
+Trials run in worker processes that share one study through a journal file
+in ``cache/optuna/`` (SQLite when the installed Optuna has no journal
+backend). Each trial is scored by k-fold cross-validation
+(``cross_validation.py``) on a joint accuracy/serving-cost objective. The
+first fold's per-tree validation RMSE is reported to Optuna, so the median
+pruner stops unpromising trials after a few dozen trees instead of training
+them to completion.
+
+A study is named after the model, a fingerprint of its training data and the
+fold count and latency weight.
+Re-running on the same data resumes the study and only runs the missing
+trials. When the data changed, the new study starts by evaluating the last
+best parameters for that model (``<model>.best.json``).
+
+Workers are fresh ``python tuning.py --worker STUDY ...`` processes rather than forks of
+the trainer (which runs at import time and may already have OpenMP threads).
+Training matrices are written once as float32 ``.npy`` files that the workers
+memory-map (or passed on by path when they already are such a file), and
+removed when the search finishes. Each worker quantizes them into per-fold ``QuantileDMatrix``
+pairs once and reuses them for all of its trials, so the histogram sketch
+isn't rebuilt per fit.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import numpy as np
+
+from artifacts import atomic_write, write_text
+from cross_validation import CV_FOLDS, LATENCY_WEIGHT, joint_score, latency_proxy
+
+STUDY_DIR = os.environ.get("SOLACE_TUNING_DIR", os.path.join("cache", "optuna"))
+N_TRIALS = int(os.environ.get("SOLACE_TUNING_TRIALS", 50))
+WORKERS = int(os.environ.get("SOLACE_TUNING_WORKERS", 0)) or os.cpu_count() or 1
+PRUNER_WARMUP_TREES = 20
+MAX_BIN = 256
+
+FIXED_PARAMS = {'random_state': 42, 'objective': 'reg:squarederror', 'verbosity': 0,
+                'tree_method': 'hist', 'max_bin': MAX_BIN}
+
+
+def suggest_params(trial):
+    """The trainers' search space."""
+    return {
+        'n_estimators': trial.suggest_int('n_estimators', 50, 300),
+        'max_depth': trial.suggest_int('max_depth', 3, 15),
+        'learning_rate': trial.suggest_float('learning_rate', 0.005, 0.3, log=True),
+        'subsample': trial.suggest_float('subsample', 0.5, 1.0),
+        'colsample_bytree': trial.suggest_float('colsample_bytree', 0.5, 1.0),
+        'gamma': trial.suggest_float('gamma', 0, 5),
+        'reg_alpha': trial.suggest_float('reg_alpha', 0, 2),
+        'reg_lambda': trial.suggest_float('reg_lambda', 0, 5),
+    }
+
+
+def _storage(name, storage_dir):
+    import optuna
+
+    try:
+        from optuna.storages.journal import JournalFileBackend
+    except ImportError:  # Optuna 3.x name
+        JournalFileBackend = getattr(optuna.storages, "JournalFileStorage", None)
+    os.makedirs(storage_dir, exist_ok=True)
+    if JournalFileBackend is None:
+        return f"sqlite:///{os.path.join(storage_dir, name + '.sqlite3')}"
+    return optuna.storages.JournalStorage(JournalFileBackend(os.path.join(storage_dir, f"{name}.journal")))
+
+
+def _load_study(study_name, storage):
+    import optuna
+
+    return optuna.create_study(
+        study_name=study_name, storage=storage, direction='minimize', load_if_exists=True,
+        pruner=optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=PRUNER_WARMUP_TREES),
+    )
+
+
+def fingerprint_arrays(*arrays):
+    h = hashlib.sha256()
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        h.update(str((a.shape, a.dtype.str)).encode())
+        h.update(a.data)
+    return h.hexdigest()[:12]
+
+
+def _npy_path(array):
+    """Path of the float32 ``.npy`` file ``array`` is memory-mapped from, if any."""
+    path = getattr(array, "filename", None) if isinstance(array, np.memmap) else None
+    if not path or not path.endswith(".npy") or array.dtype != np.float32:
+        return None
+    # A slice of a mapped file is also an np.memmap; only the whole array qualifies
+    on_disk = np.load(path, mmap_mode="r")
+    return path if on_disk.shape == array.shape and on_disk.offset == array.offset else None
+
+
+def save_arrays(arrays, data_dir):
+    """Float32 ``.npy`` paths for ``arrays``, writing ``<data_dir>/<key>.npy`` only where needed.
+
+    Arrays already memory-mapped from a float32 ``.npy`` file (a worker's
+    inputs) are passed on by path instead of being copied again.
+    """
+    paths = []
+    for key, array in arrays.items():
+        path = _npy_path(array)
+        if path is not None:
+            paths.append(path)
+            continue
+        path = os.path.join(data_dir, f"{key}.npy")
+        if not os.path.exists(path):
+            atomic_write(path, lambda tmp: np.save(tmp, np.asarray(array, dtype=np.float32)), suffix=".npy")
+        paths.append(path)
+    return paths
+
+
+def _native_params(params):
+    """XGBRegressor-style params as ``xgboost.train`` params and a round count."""
+    params = dict(params)
+    rounds = params.pop('n_estimators')
+    params['seed'] = params.pop('random_state')
+    return params, rounds
+
+
+def _objective(trial, cv, latency_weight):
+    import optuna
+
+    params, rounds = _native_params({**suggest_params(trial), **FIXED_PARAMS})
+
+    def on_iteration(tree, rmse):
+        trial.report(rmse / cv.y_scale, tree)
+        return trial.should_prune()
+
+    result = cv.evaluate(params, rounds, on_iteration)
+    if result["stopped"]:
+        raise optuna.TrialPruned(f"pruned at tree {result['trees']}")
+    trial.set_user_attr("cv_rmse", result["rmse"])
+    trial.set_user_attr("latency_proxy", latency_proxy(result["trees"], params['max_depth']))
+    return joint_score(result["rmse"], cv.y_scale, result["trees"], params['max_depth'], latency_weight)
+
+
+def _run_worker(study_name, storage_dir, data_paths, n_trials, threads, folds, latency_weight):
+    """Worker process: open the shared study and run ``n_trials`` trials."""
+    import optuna
+
+    from cross_validation import FoldMatrices
+
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    X, y = (np.load(p, mmap_mode="r") for p in data_paths)
+    # Quantized once per worker and shared by every trial it runs
+    cv = FoldMatrices(X, y, folds=folds, max_bin=MAX_BIN, threads=threads)
+    study = _load_study(study_name, _storage(study_name, storage_dir))
+    study.optimize(lambda trial: _objective(trial, cv, latency_weight), n_trials=n_trials, gc_after_trial=True)
+
+
+def _finished(study):
+    from optuna.trial import TrialState
+
+    return sum(t.state in (TrialState.COMPLETE, TrialState.PRUNED) for t in study.trials)
+
+
+def _best_path(name, storage_dir):
+    return os.path.join(storage_dir, f"{name}.best.json")
+
+
+def tune(name, X, y, n_trials=N_TRIALS, workers=WORKERS, storage_dir=STUDY_DIR, cores=None,
+         folds=CV_FOLDS, latency_weight=LATENCY_WEIGHT):
+    """Best XGBRegressor params (search space plus FIXED_PARAMS) for one model.
+
+    ``name`` identifies the model across runs (e.g. ``"cost-low"``). Trials
+    are scored by ``folds``-fold cross-validation on ``X``/``y`` with
+    ``cross_validation.joint_score``. ``cores`` is how many cores this search
+    may use (all by default), split between the workers.
+    """
+    fingerprint = fingerprint_arrays(X, y)
+    study_name = f"{name}-{fingerprint}-k{folds}-w{latency_weight:g}"
+    study = _load_study(study_name, _storage(study_name, storage_dir))
+
+    if not study.trials and os.path.exists(_best_path(name, storage_dir)):
+        with open(_best_path(name, storage_dir)) as f:
+            study.enqueue_trial(json.load(f))
+
+    remaining = max(0, n_trials - _finished(study))
+    if remaining:
+        data_dir = os.path.join(storage_dir, "data", fingerprint)
+        data_paths = save_arrays({"X": X, "y": y}, data_dir)
+        cores = cores or os.cpu_count() or 1
+        workers = max(1, min(workers, remaining, cores))
+        threads = max(1, cores // workers)
+        shares = [remaining // workers + (i < remaining % workers) for i in range(workers)]
+        procs = [subprocess.Popen([sys.executable, os.path.abspath(__file__), "--worker", study_name,
+                                   "--storage-dir", storage_dir, "--trials", str(share),
+                                   "--threads", str(threads), "--folds", str(folds),
+                                   "--latency-weight", str(latency_weight), *data_paths])
+                 for share in shares if share]
+        failed = [p.args for p in procs if p.wait() != 0]
+        shutil.rmtree(data_dir, ignore_errors=True)
+        if failed:
+            raise RuntimeError(f"{len(failed)} tuning worker(s) failed for {study_name}")
+        study = _load_study(study_name, _storage(study_name, storage_dir))
+
+    best_params = dict(study.best_params)
+    atomic_write(_best_path(name, storage_dir), lambda tmp: write_text(tmp, json.dumps(best_params, indent=2)))
+
+    attrs = study.best_trial.user_attrs
+    print(f"🔎 {name}: {folds}-fold RMSE {attrs.get('cv_rmse', float('nan')):.4f}, "
+          f"trees × depth {attrs.get('latency_proxy', '?')}, score {study.best_value:.4f} "
+          f"after {_finished(study)} trials ({remaining} run now on {workers if remaining else 0} workers)")
+    return {**best_params, **FIXED_PARAMS}
+
+
+def _worker_parser():
+    parser = argparse.ArgumentParser(description="Tuning worker (started by tune())")
+    parser.add_argument("--worker", required=True, metavar="STUDY")
+    parser.add_argument("--storage-dir", required=True)
+    parser.add_argument("--trials", type=int, required=True)
+    parser.add_argument("--threads", type=int, required=True)
+    parser.add_argument("--folds", type=int, required=True)
+    parser.add_argument("--latency-weight", type=float, required=True)
+    parser.add_argument("data", nargs=2, metavar=("X.npy", "Y.npy"))
+    return parser
+
+
+if __name__ == "__main__":
+    args = _worker_parser().parse_args()
+    _run_worker(args.worker, args.storage_dir, args.data, args.trials, args.threads, args.folds,
+                args.latency_weight)